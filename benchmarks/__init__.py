@@ -0,0 +1,8 @@
+"""
+Benchmarks for the puzzle pipeline.
+"""
+import os
+import sys
+
+# Make the crossword package importable when run as ``python -m benchmarks.run``
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
@@ -0,0 +1,111 @@
+"""
+Time the puzzle pipeline hot paths and compare them with a stored baseline.
+
+    python -m benchmarks.run              # compare with benchmarks/baseline.json
+    python -m benchmarks.run --save       # record a new baseline
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from crossword.crossword_builder import build_crossword, build_entries, process_rebus_grid
+from crossword.entity import Crossword
+from crossword.grid_analysis import analyze_grid
+
+from .synthetic import generate_crossword, generate_payload
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name: (size, black-square density, rebus rate)
+PUZZLES = {
+    "15x15": (15, 0.16, 0.0),
+    "15x15-open": (15, 0.10, 0.0),
+    "15x15-rebus": (15, 0.16, 0.08),
+    "21x21": (21, 0.17, 0.0),
+    "21x21-dense": (21, 0.24, 0.0),
+    "21x21-rebus": (21, 0.17, 0.05),
+}
+
+
+def cases() -> List[Tuple[str, Callable[[], object]]]:
+    benchmarks = []
+    for name, (size, density, rebus_rate) in PUZZLES.items():
+        crossword = generate_crossword(size, density, rebus_rate, seed=size)
+        payload = generate_payload(crossword, trailer=True)
+        benchmarks.extend([
+            (f"process_rebus_grid[{name}]", lambda c=crossword: process_rebus_grid(c.grid)),
+            (f"build_crossword[{name}]", lambda c=crossword: build_crossword(c)),
+            # Repeat builds of one shape hit the layout cache; analyze_grid is the miss path
+            (f"build_entries[{name}]", lambda c=crossword: build_entries(c)),
+            (f"analyze_grid[{name}]", lambda g=process_rebus_grid(crossword.grid)[0]: analyze_grid(g)),
+            (f"from_api_response[{name}]", lambda p=payload: Crossword.from_api_response(p)),
+        ])
+    return benchmarks
+
+
+def measure(func: Callable[[], object], min_time: float = 0.2) -> Dict[str, float]:
+    """Best-of-5 seconds per call, plus the peak memory allocated during one call."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    seconds = min(timer.repeat(repeat=5, number=number)) / number
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Benchmarks whose time or peak allocation grew by more than ``tolerance``."""
+    regressions = []
+    for name, result in results.items():
+        for metric in ("seconds", "peak_bytes"):
+            if name in baseline and result[metric] > baseline[name][metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("-k", dest="filter", default="", help="only run benchmarks containing this text")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'benchmark':40} {'time':>10} {'vs base':>8} {'peak alloc':>11}")
+    for name, func in cases():
+        if args.filter not in name:
+            continue
+        result = results[name] = measure(func)
+        change = ""
+        if name in baseline:
+            change = f"{result['seconds'] / baseline[name]['seconds'] - 1:+.0%}"
+        print(f"{name:40} {result['seconds'] * 1e6:8.1f}us {change:>8} {result['peak_bytes'] / 1024:9.1f}KB")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for name in regressions:
+        print(f"REGRESSION: {name} is more than {args.tolerance:.0%} above baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
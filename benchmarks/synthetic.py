@@ -0,0 +1,80 @@
+import random
+import string
+from typing import List
+
+from crossword.crossword_builder import process_rebus_grid
+from crossword.entity import Clue, Crossword
+from crossword.grid_analysis import analyze_grid
+
+
+def generate_grid(size: int = 15, density: float = 0.16, rebus_rate: float = 0.0, seed: int = 0) -> List[str]:
+    """Random square grid in upstream form, with rotationally symmetric black squares.
+
+    ``density`` is the share of black squares and ``rebus_rate`` the share of open
+    cells holding a multi-letter rebus, written comma-separated as upstream does.
+    """
+    rng = random.Random(seed)
+    black = set()
+    while len(black) < density * size * size:
+        x, y = rng.randrange(size), rng.randrange(size)
+        black.add((x, y))
+        black.add((size - 1 - x, size - 1 - y))
+    rows = []
+    for y in range(size):
+        cells = []
+        for x in range(size):
+            if (x, y) in black:
+                cells.append("#")
+            elif rng.random() < rebus_rate:
+                cells.append(",".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 4))))
+            else:
+                cells.append(rng.choice(string.ascii_uppercase))
+        rows.append("".join(cells))
+    return rows
+
+
+def generate_crossword(size: int = 15, density: float = 0.16, rebus_rate: float = 0.0, seed: int = 0) -> Crossword:
+    """Crossword with one clue for every word slot of a generated grid."""
+    grid = generate_grid(size, density, rebus_rate, seed)
+    layout = analyze_grid(process_rebus_grid(grid)[0])
+    rng = random.Random(seed)
+
+    def clue(span):
+        words = " ".join(rng.choice(("Opera", "highlight", "Capital of", "Partner of", "__ the line"))
+                         for _ in range(rng.randint(2, 6)))
+        return Clue(hint=f"{span.number}. {words}")
+
+    return Crossword(
+        date="231026",
+        title=f"Synthetic {size}x{size}",
+        authors=["Bench Marker", "Will Shortz"],
+        size={"rows": size, "cols": size},
+        grid=grid,
+        across=[clue(span) for span in layout.across],
+        down=[clue(span) for span in layout.down],
+    )
+
+
+def generate_payload(crossword: Crossword, trailer: bool = False) -> str:
+    """Render a crossword in the nytsyn upstream text format.
+
+    A missing ``size`` is taken from the grid. ``trailer`` appends the Java
+    stack trace upstream sometimes sends after the puzzle.
+    """
+    sections = [
+        "ARCHIVE",
+        crossword.date,
+        crossword.title,
+        " / ".join(crossword.authors),
+        str(crossword.size.get("rows", len(crossword.grid))),
+        str(crossword.size.get("cols", len(crossword.grid[0]) if crossword.grid else 0)),
+        str(len(crossword.across)),
+        str(len(crossword.down)),
+        "\n".join(crossword.grid),
+        "\n".join(clue.hint for clue in crossword.across),
+        "\n".join(clue.hint for clue in crossword.down),
+    ]
+    payload = "\n\n".join(sections) + "\n"
+    if trailer:
+        payload += "org.apache.catalina.connector.ClientAbortException: java.io.IOException\n"
+    return payload
@@ -0,0 +1,128 @@
+import os
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .entity import Entry
+
+WILDCARDS = "_?."
+
+
+class AnswerMatch(NamedTuple):
+    answer: str
+    count: int
+    dates: List[str]
+
+
+class AnswerIndex:
+    """Answers bucketed by length, with one bitset per (position, letter).
+
+    Bit ``i`` of ``_letters[length][position][letter]`` is set when the ``i``-th
+    answer of that length has ``letter`` at ``position``, so a pattern such as
+    ``_A_E`` is answered by AND-ing the bitsets of its known letters. Rebus
+    answers are indexed flattened, the way ``build_entries`` spells them
+    (``HEARTOFGOLD``), so their length counts letters rather than cells.
+    An answer whose last occurrence is removed keeps its bit but is no longer
+    matched. ``load`` indexes a whole archive in a background thread, so
+    lookups only ever pay for the puzzles written since.
+    """
+
+    def __init__(self):
+        self._answers: Dict[int, List[str]] = {}
+        self._letters: Dict[int, List[Dict[str, int]]] = {}
+        self._occurrences: Dict[str, Set[Tuple[str, str, int]]] = {}
+        self._by_date: Dict[str, Set[Tuple[str, Tuple[str, str, int]]]] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._loader: Optional[threading.Thread] = None
+        self._loader_pid = None
+
+    def __len__(self) -> int:
+        return sum(1 for occurrences in self._occurrences.values() if occurrences)
+
+    def add(self, date: str, entries: Iterable[Entry]) -> None:
+        """Index the entries of the puzzle published on ``date``; re-adding a puzzle is a no-op."""
+        with self._lock:
+            for entry in entries:
+                self._add(entry.answer, (date, entry.direction, entry.index))
+
+    def refresh(self, archive) -> int:
+        """Index clues written to a ``SQLiteArchive`` since the last refresh; returns how many.
+
+        A puzzle written again replaces the answers indexed for its date.
+        """
+        changes = archive.clue_changes(self._seq)
+        with self._lock:
+            for date in changes.dates:
+                self._remove(date)
+            for date, direction, number, answer in changes.clues:
+                if answer:
+                    self._add(answer, (date, direction, number))
+            self._seq = changes.seq
+        return len(changes.clues)
+
+    def load(self, archive) -> None:
+        """Start indexing all of ``archive`` in a background thread; a no-op once started in this process.
+
+        A forked worker starts its own, which resumes from whatever the parent
+        had indexed.
+        """
+        with self._lock:
+            if self._loaded.is_set() or self._loader_pid == os.getpid():
+                return
+            self._loader = threading.Thread(target=self._load, args=(archive,), name="answer-index", daemon=True)
+            self._loader_pid = os.getpid()
+            self._loader.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to ``timeout`` seconds for ``load`` to finish; returns whether it has."""
+        return self._loaded.wait(timeout)
+
+    def _load(self, archive) -> None:
+        try:
+            self.refresh(archive)
+        except Exception as e:
+            # The next refresh picks up from wherever this one stopped
+            print(f"Answer index load failed: {e!r}")
+        finally:
+            self._loaded.set()
+
+    def _add(self, answer: str, occurrence: Tuple[str, str, int]) -> None:
+        answer = answer.upper()
+        occurrences = self._occurrences.get(answer)
+        if occurrences is None:
+            occurrences = self._occurrences[answer] = set()
+            answers = self._answers.setdefault(len(answer), [])
+            positions = self._letters.setdefault(len(answer), [{} for _ in answer])
+            bit = 1 << len(answers)
+            answers.append(answer)
+            for position, letter in enumerate(answer):
+                positions[position][letter] = positions[position].get(letter, 0) | bit
+        occurrences.add(occurrence)
+        self._by_date.setdefault(occurrence[0], set()).add((answer, occurrence))
+
+    def _remove(self, date: str) -> None:
+        for answer, occurrence in self._by_date.pop(date, ()):
+            self._occurrences[answer].discard(occurrence)
+
+    def match(self, pattern: str, limit: int = 100) -> List[AnswerMatch]:
+        """Answers fitting ``pattern`` (``_``, ``?`` or ``.`` for unknown letters), most frequent first."""
+        pattern = pattern.upper()
+        with self._lock:
+            answers = self._answers.get(len(pattern), [])
+            positions = self._letters.get(len(pattern), [])
+            candidates = (1 << len(answers)) - 1
+            for position, letter in enumerate(pattern):
+                if letter not in WILDCARDS:
+                    candidates &= positions[position].get(letter, 0) if positions else 0
+                    if not candidates:
+                        return []
+            # Reversed binary digits: character i is bit i
+            found = [answers[i] for i, bit in enumerate(bin(candidates)[:1:-1])
+                     if bit == "1" and self._occurrences[answers[i]]]
+            found.sort(key=lambda answer: (-len(self._occurrences[answer]), answer))
+            return [self._match(answer) for answer in found[:limit]]
+
+    def _match(self, answer: str) -> AnswerMatch:
+        occurrences = self._occurrences[answer]
+        return AnswerMatch(answer, len(occurrences), sorted({date for date, _, _ in occurrences}, reverse=True))
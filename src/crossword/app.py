@@ -1,14 +1,24 @@
-import random
-from datetime import datetime, timedelta
 import os
+import sqlite3
+import time
 
-from flask import Flask, render_template
-import requests
+from flask import Flask, Response, g, jsonify, render_template, request, url_for
 
+from .answer_index import AnswerIndex
+from .archive import SQLiteArchive
+from .assets import Asset, AssetManifest, make_asset
 from .data_reader import DataReader
-
-from .entity import Crossword
-from .crossword_builder import build_crossword
+from .date_sampler import WeekdaySampler, WEEKDAYS, held_dates
+from .metrics import metrics, server_timing, start_request_timing
+from .payload_parser import PayloadParseError
+from .puzzle_store import PuzzleStore, DEFAULT_MAX_BYTES, normalize_date
+from .resilience import CircuitOpenError, UpstreamBusyError, UpstreamError, UpstreamNotFoundError
+from .response_cache import CachedResponse, ResponseCache
+from .serialization import accepts_compact, dumps_puzzle_list, puzzle_mimetype
+from .service import PuzzleService
+from .shared_cache import SharedCache
+from .throttle import UpstreamScheduler, set_upstream_priority
+from .warm_pool import WarmPool
 
 # Get the directory containing this file
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,63 +27,253 @@ app = Flask(__name__,
            template_folder=os.path.join(current_dir, 'templates'),
            static_folder=os.path.join(current_dir, 'static'))
 
+# Static files are fingerprinted and gzipped once, at startup
+assets = AssetManifest(app.static_folder).build()
+# Rendered on first request; the page only changes when the process restarts
+rendered_index = None
+
+base_url = "https://nytsyn.pzzl.com/nytsyn-crossword-mh/nytsyncrossword"
+
+# Published puzzles never change, so raw payloads are kept on disk between requests
+store = PuzzleStore(
+    os.environ.get('CROSSWORD_STORE_DIR', os.path.expanduser('~/.cache/crossword/puzzles')),
+    max_bytes=int(os.environ.get('CROSSWORD_STORE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+)
+# One upstream budget for the process; prefetches (?priority=prefetch or an
+# X-Crossword-Priority: prefetch header) are shed first when it runs short
+upstream_scheduler = UpstreamScheduler(
+    rate=float(os.environ.get('CROSSWORD_UPSTREAM_RATE', 10)),
+    burst=int(os.environ.get('CROSSWORD_UPSTREAM_BURST', 20)),
+)
+reader = DataReader(base_url=base_url, store=store, rate_limiter=upstream_scheduler)
+# Set CROSSWORD_SHARED_CACHE to a file path when running several worker processes
+service = PuzzleService(
+    reader,
+    cache=ResponseCache(int(os.environ.get('CROSSWORD_RESPONSE_CACHE_SIZE', 512))),
+    shared=SharedCache(os.environ['CROSSWORD_SHARED_CACHE']) if os.environ.get('CROSSWORD_SHARED_CACHE') else None,
+)
+sampler = WeekdaySampler()
+archive_sampler = WeekdaySampler(available=store)
+# Pre-built random puzzles; CROSSWORD_WARM_POOL_HIGH=0 (the default) turns the pool off
+warm_pool = WarmPool(
+    service, sampler,
+    low=int(os.environ.get('CROSSWORD_WARM_POOL_LOW', 2)),
+    high=int(os.environ.get('CROSSWORD_WARM_POOL_HIGH', 0)),
+)
+# Harvested archive backing /search; see README "Backfilling the archive"
+archive = SQLiteArchive(os.environ['CROSSWORD_ARCHIVE']) if os.environ.get('CROSSWORD_ARCHIVE') else None
+answer_index = AnswerIndex()
+if archive is not None:
+    # Index the archive up front so /answers only has to pick up new puzzles
+    answer_index.load(archive)
+
+# Upper bound for /random_crossword/<weekday>?count=N
+MAX_BATCH_SIZE = 50
+SEARCH_PAGE_SIZE = 20
+# Most recent source dates listed per answer by /answers
+MAX_ANSWER_DATES = 20
+# How long /answers waits for the initial answer index load before answering 503
+ANSWER_INDEX_WAIT = 1.0
+
+
+@app.before_request
+def start_timing():
+    g.started = time.perf_counter()
+    g.timings = start_request_timing()
+    set_upstream_priority(request.headers.get('X-Crossword-Priority', request.args.get('priority')))
+
+
+@app.after_request
+def record_timing(response):
+    if 'started' in g and request.endpoint != 'get_metrics':
+        metrics.observe('crossword_request_seconds', time.perf_counter() - g.started,
+                        endpoint=request.endpoint or 'unknown')
+        if g.timings:
+            response.headers['Server-Timing'] = server_timing(g.timings)
+    return response
+
+
+@app.errorhandler(PayloadParseError)
+def malformed_payload(error):
+    return f'Upstream returned a malformed puzzle (bad {error.section} section)', 502
+
+
+@app.errorhandler(UpstreamNotFoundError)
+def puzzle_not_found(error):
+    return 'No puzzle published for that date', 404
+
+
+@app.errorhandler(UpstreamError)
+def upstream_unavailable(error):
+    if isinstance(error, (CircuitOpenError, UpstreamBusyError)):
+        retry_after = error.retry_after
+    else:
+        retry_after = reader.breaker.reset_timeout
+    return 'Upstream is unavailable, try again later', 503, {'Retry-After': str(max(1, round(retry_after)))}
+
+
+@app.context_processor
+def asset_helpers():
+    def asset_url(filename):
+        return assets.url(filename) or url_for('static', filename=filename)
+    return {'asset_url': asset_url}
+
+
+def send_asset(asset: Asset, cache_control: str) -> Response:
+    """Send ``asset``, gzipped when the client accepts it, answering ``If-None-Match`` with 304."""
+    use_gzip = asset.gzipped is not None and request.accept_encodings['gzip'] > 0
+    response = Response(asset.gzipped if use_gzip else asset.body, mimetype=asset.mimetype)
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    # The two encodings are different bytes, so they need different strong ETags
+    response.set_etag(asset.etag + '-gz' if use_gzip else asset.etag)
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
 
 @app.route('/')
-def index():  # return the static content at static/app.html
-    html = render_template('newapp.html')
-    return html
+def index():
+    global rendered_index
+    if rendered_index is None:
+        rendered_index = make_asset('index.html', render_template('newapp.html').encode('utf-8'))
+    # no-cache: the page names the current asset fingerprints, so it must be revalidated
+    return send_asset(rendered_index, 'no-cache')
+
+
+@app.route('/assets/<path:name>')
+def get_asset(name):
+    asset = assets.get(name)
+    if asset is None:
+        return 'Not found', 404
+    return send_asset(asset, 'public, max-age=31536000, immutable')
+
+
 @app.route('/crossword/<date>')
 def get_crossword(date):
-    content = requests.get(f'https://nytsyn.pzzl.com/nytsyn-crossword-mh/nytsyncrossword?date={date}').text
+    try:
+        content = reader._fetch_data(date)
+    except ValueError:
+        return 'Invalid date', 400
     return content
 
 
-def daterange(begin, end):
-    current_date = begin
-    while current_date < end:
-        yield current_date
-        current_date += timedelta(days=1)
+def wants_compact() -> bool:
+    return accepts_compact(request.args.get('format'), request.headers.get('Accept', ''))
 
 
-base_url = "https://nytsyn.pzzl.com/nytsyn-crossword-mh/nytsyncrossword"
+def puzzle_response(cached: CachedResponse, cache_control: str) -> Response:
+    """Send a cached puzzle body, answering ``If-None-Match`` with 304 when the ETag matches.
+
+    ``cached`` must be in the format the request negotiated, which sets the content type.
+    """
+    response = Response(cached.body, mimetype=puzzle_mimetype(wants_compact()))
+    response.set_etag(cached.etag)
+    response.headers['Cache-Control'] = cache_control
+    # The body format can be negotiated through Accept
+    response.vary.add('Accept')
+    return response.make_conditional(request)
+
+
+@app.route('/puzzle/<date>')
+def get_puzzle(date):
+    """Built puzzle for a ``yymmdd`` or ``yyyymmdd`` date, cacheable by date."""
+    try:
+        date = normalize_date(date)
+    except ValueError:
+        return 'Invalid date', 400
+    return puzzle_response(service.get_puzzle(date, compact=wants_compact()), 'public, max-age=86400')
 
 
 @app.route('/random_crossword/<weekday>')
 def get_random_crossword(weekday):
-    begin = datetime(2010, 1, 1)
-    end = datetime.today()
+    """Return one random puzzle for ``weekday``, or ``{"puzzles": [...]}`` when ``?count=N`` is given.
+
+    ``?exclude=yymmdd,...`` and ``?have=<bitmap>`` (see ``held_dates``) skip
+    dates the client already has or has solved, and ``?archived=1``
+    only picks dates that are already in the local puzzle store, as does every
+    request while the upstream circuit breaker is open. ``?format=compact`` (or
+    ``Accept: application/vnd.crossword.compact+json``) selects the compact body.
+    """
     weekday = weekday.lower()
-    weekday_map = {
-        'monday': 0,
-        'tuesday': 1,
-        'wednesday': 2,
-        'thursday': 3,
-        'friday': 4,
-        'saturday': 5,
-        'sunday': 6
-    }
-    if weekday not in weekday_map:
+    if weekday not in WEEKDAYS:
         return 'Invalid weekday'
-    random_date = random.choice([date for date in daterange(begin, end) if date.weekday() == weekday_map[weekday]])
-    reader = DataReader(base_url=base_url)
-    formatted_date = random_date.strftime("%y%m%d")
-    print(f"Fetching crossword for {weekday} {formatted_date}")
-    crossword_data = Crossword.from_api_response(reader._fetch_data(formatted_date))
-    print(f'Crossword for {formatted_date} fetched')
-    #Validate that the crosswords date is the correct weekday
-    assert datetime.strptime(crossword_data.date, "%y%m%d").weekday() == weekday_map[weekday]
-    
-    entities = build_crossword(crossword_data)
-    
-    response_data = {
-        "metadata": {
-            "date": crossword_data.date,
-            "title": crossword_data.title,
-            "authors": crossword_data.authors
-        },
-        "entries": [entity.dict() for entity in entities]
-    }
-    return response_data
+    exclude = [key for key in request.args.get('exclude', '').split(',') if key]
+    try:
+        held = held_dates(WEEKDAYS[weekday], request.args.get('have', ''))
+    except ValueError:
+        return 'Invalid have bitmap', 400
+    # Dates go to the sampler as they are, skipping a parse per held date
+    exclude += held
+    date_sampler = archive_sampler if request.args.get('archived') or reader.breaker.is_open else sampler
+    compact = wants_compact()
+    count = request.args.get('count', type=int)
+    if count is not None:
+        count = max(1, min(count, MAX_BATCH_SIZE))
+        dates = [date.strftime("%y%m%d") for date in date_sampler.sample(WEEKDAYS[weekday], count, exclude)]
+        app.logger.info("Fetching %d crosswords for %s", len(dates), weekday)
+        response = Response(dumps_puzzle_list(service.build_puzzles(dates, WEEKDAYS[weekday], compact)),
+                            mimetype=puzzle_mimetype(compact))
+        response.vary.add('Accept')
+        return response
+
+    if date_sampler is sampler:
+        warmed = warm_pool.pop(WEEKDAYS[weekday], exclude)
+        if warmed is not None:
+            date, cached = warmed
+            if compact:
+                # The pool's payload is in the store by now, so this skips upstream
+                cached = service.get_puzzle(date, WEEKDAYS[weekday], compact=True)
+            return puzzle_response(cached, 'no-cache')
+    dates = date_sampler.sample(WEEKDAYS[weekday], 1, exclude)
+    if not dates:
+        return 'No crosswords left for this weekday', 404
+    formatted_date = dates[0].strftime("%y%m%d")
+    app.logger.info("Fetching crossword for %s %s", weekday, formatted_date)
+    # no-cache: clients revalidate, and get a 304 if the same puzzle comes up again
+    return puzzle_response(service.get_puzzle(formatted_date, WEEKDAYS[weekday], compact), 'no-cache')
+
+
+@app.route('/search')
+def search():
+    """Ranked clue search over the archive: ``?q=words&page=N`` (pages start at 1)."""
+    if archive is None:
+        return 'Search needs CROSSWORD_ARCHIVE to point at a harvested archive', 503
+    query = request.args.get('q', '')
+    page = max(1, request.args.get('page', 1, type=int))
+    with metrics.stage('search'):
+        # One extra row tells whether there is a next page without counting every match
+        try:
+            results = archive.search(query, limit=SEARCH_PAGE_SIZE + 1, offset=(page - 1) * SEARCH_PAGE_SIZE)
+        except sqlite3.OperationalError as e:
+            return f'Unsupported search query: {e}', 400
+    return jsonify(query=query, page=page, results=results[:SEARCH_PAGE_SIZE],
+                   has_more=len(results) > SEARCH_PAGE_SIZE)
+
+
+@app.route('/answers')
+def find_answers():
+    """Archived answers fitting ``?pattern=_A_E`` (``_`` or ``?`` per unknown letter), most used first."""
+    if archive is None:
+        return 'Answer lookup needs CROSSWORD_ARCHIVE to point at a harvested archive', 503
+    pattern = request.args.get('pattern', '')
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    answer_index.load(archive)
+    if not answer_index.wait(ANSWER_INDEX_WAIT):
+        return 'The answer index is still loading, try again shortly', 503, {'Retry-After': '5'}
+    with metrics.stage('answers'):
+        # Picks up puzzles harvested into the archive since the last lookup
+        answer_index.refresh(archive)
+        matches = answer_index.match(pattern, limit)
+    return jsonify(pattern=pattern, matches=[
+        {'answer': match.answer, 'count': match.count, 'dates': match.dates[:MAX_ANSWER_DATES]}
+        for match in matches
+    ])
+
+
+@app.route('/metrics')
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/grid')
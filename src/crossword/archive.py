@@ -0,0 +1,354 @@
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from .crossword_builder import build_entries
+from .entity import Clue, Crossword, Entry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    date TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    weekday INTEGER NOT NULL,
+    title TEXT NOT NULL COLLATE NOCASE,
+    authors TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    grid TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS puzzle_authors (
+    author TEXT NOT NULL COLLATE NOCASE,
+    date TEXT NOT NULL,
+    PRIMARY KEY (author, date)
+);
+CREATE TABLE IF NOT EXISTS clues (
+    date TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    hint TEXT NOT NULL,
+    number INTEGER,
+    x INTEGER,
+    y INTEGER,
+    answer TEXT,
+    PRIMARY KEY (date, direction, position)
+);
+CREATE INDEX IF NOT EXISTS puzzles_day ON puzzles (day);
+CREATE INDEX IF NOT EXISTS puzzles_weekday ON puzzles (weekday, day);
+CREATE INDEX IF NOT EXISTS puzzles_title ON puzzles (title);
+CREATE INDEX IF NOT EXISTS puzzle_authors_date ON puzzle_authors (date);
+"""
+
+# The latest write of each puzzle, numbered in write order, for readers that
+# keep their own index of the clues in step with the archive
+WRITES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzle_writes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL UNIQUE
+);
+CREATE TRIGGER IF NOT EXISTS puzzles_written AFTER INSERT ON puzzles BEGIN
+    DELETE FROM puzzle_writes WHERE date = new.date;
+    INSERT INTO puzzle_writes (date) VALUES (new.date);
+END;
+"""
+
+# Full-text index over clue hints and answers, kept in step with ``clues`` by triggers
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS clue_search USING fts5(
+    hint, answer, content='clues', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2', detail=column
+);
+CREATE TRIGGER IF NOT EXISTS clues_search_insert AFTER INSERT ON clues BEGIN
+    INSERT INTO clue_search (rowid, hint, answer) VALUES (new.rowid, new.hint, new.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS clues_search_delete AFTER DELETE ON clues BEGIN
+    INSERT INTO clue_search (clue_search, rowid, hint, answer) VALUES ('delete', old.rowid, old.hint, old.answer);
+END;
+"""
+
+# Answers count double: a query matching the answer is usually what was meant
+SEARCH_WEIGHTS = (1.0, 2.0)
+# Matches are ranked in fixed blocks of this many, newest block first, so words
+# found in a large share of all clues cost about as much as rare ones
+SEARCH_CANDIDATES = 500
+
+
+class SQLiteArchive:
+    """Indexed SQLite archive of puzzles with the same ``save`` interface as ``CSVWriter``.
+
+    Saves are buffered and written ``batch_size`` at a time in one transaction;
+    call ``flush`` or ``close`` (or use it as a context manager) to write the rest.
+    Clues are stored one row per clue along with the answer and position that
+    ``build_entries`` assigns them.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[Crossword] = []
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        has_writes = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'puzzle_writes'"
+        ).fetchone()
+        self.connection.executescript(WRITES_SCHEMA)
+        if not has_writes:
+            with self.connection:
+                self.connection.execute("INSERT INTO puzzle_writes (date) SELECT date FROM puzzles ORDER BY date")
+        has_search = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'clue_search'"
+        ).fetchone()
+        self.connection.executescript(SEARCH_SCHEMA)
+        if not has_search:
+            # Archives written before the search index existed are indexed once here
+            self.rebuild_search()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def save(self, crossword: Crossword) -> None:
+        self._pending.append(crossword)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered puzzles in a single transaction."""
+        if not self._pending:
+            return
+        puzzles, self._pending = self._pending, []
+        self.write_rows([puzzle_rows(crossword) for crossword in puzzles])
+
+    def write_rows(self, rows: List["PuzzleRows"]) -> None:
+        """Replace the puzzles in ``rows`` (from ``puzzle_rows``) in a single transaction."""
+        if not rows:
+            return
+        dates = [(puzzle[0],) for puzzle, _, _ in rows]
+        with self._lock, self.connection:
+            self.connection.executemany("DELETE FROM puzzle_authors WHERE date = ?", dates)
+            self.connection.executemany("DELETE FROM clues WHERE date = ?", dates)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO puzzles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [puzzle for puzzle, _, _ in rows]
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO puzzle_authors VALUES (?, ?)", [row for _, authors, _ in rows for row in authors]
+            )
+            self.connection.executemany(
+                "INSERT INTO clues VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [row for _, _, clues in rows for row in clues]
+            )
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    def find(self, weekday: Optional[int] = None, author: Optional[str] = None,
+             title: Optional[str] = None, start: Optional[str] = None,
+             end: Optional[str] = None) -> List[Dict]:
+        """Puzzle metadata matching every given filter, oldest first.
+
+        ``start`` and ``end`` are inclusive ISO dates; ``author`` and ``title``
+        match exactly, ignoring case.
+        """
+        query = "SELECT p.date, p.day, p.weekday, p.title, p.authors FROM puzzles p"
+        conditions, params = [], []
+        if author is not None:
+            query += " JOIN puzzle_authors a ON a.date = p.date"
+            conditions.append("a.author = ?")
+            params.append(author)
+        for column, operator, value in (
+            ("p.weekday", "=", weekday), ("p.title", "=", title),
+            ("p.day", ">=", start), ("p.day", "<=", end),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY p.day"
+        with self._lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [
+            {"date": date, "day": day, "weekday": weekday, "title": title, "authors": json.loads(authors)}
+            for date, day, weekday, title, authors in rows
+        ]
+
+    def get(self, date: str) -> Optional[Crossword]:
+        """Rebuild the stored ``Crossword`` for a ``yymmdd`` date."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT title, authors, rows, cols, grid FROM puzzles WHERE date = ?", (date,)
+            ).fetchone()
+            clues = self.connection.execute(
+                "SELECT direction, hint FROM clues WHERE date = ? ORDER BY direction, position", (date,)
+            ).fetchall()
+        if row is None:
+            return None
+        title, authors, rows, cols, grid = row
+        return Crossword(
+            date=date,
+            title=title,
+            authors=json.loads(authors),
+            size={'rows': rows, 'cols': cols},
+            grid=json.loads(grid),
+            across=[Clue(hint=hint) for direction, hint in clues if direction == "across"],
+            down=[Clue(hint=hint) for direction, hint in clues if direction == "down"],
+        )
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """Clues whose hint or answer contain every word of ``query``, best match first.
+
+        Matches are taken newest first in blocks of ``SEARCH_CANDIDATES`` and
+        ranked by BM25 within each block only: a strong match in an older block
+        comes after every match in a newer one. The blocks do not depend on
+        ``offset``, so consecutive pages neither overlap nor skip a result.
+        """
+        match = _match_expression(query)
+        if not match:
+            return []
+        first_block = offset // SEARCH_CANDIDATES
+        blocks = (offset + limit - 1) // SEARCH_CANDIDATES - first_block + 1
+        with self._lock:
+            rows = self.connection.execute(
+                f"""
+                SELECT c.date, c.direction, c.number, c.hint, c.answer, p.title
+                FROM (
+                    SELECT rowid, score, (row_number() OVER (ORDER BY rowid DESC) - 1) / ? AS block
+                    FROM (
+                        SELECT rowid, bm25(clue_search, {SEARCH_WEIGHTS[0]}, {SEARCH_WEIGHTS[1]}) AS score
+                        FROM clue_search WHERE clue_search MATCH ?
+                        ORDER BY rowid DESC LIMIT ? OFFSET ?
+                    )
+                ) s
+                JOIN clues c ON c.rowid = s.rowid
+                JOIN puzzles p ON p.date = c.date
+                ORDER BY s.block, s.score, s.rowid DESC
+                LIMIT ? OFFSET ?
+                """,
+                (SEARCH_CANDIDATES, match, blocks * SEARCH_CANDIDATES, first_block * SEARCH_CANDIDATES,
+                 limit, offset - first_block * SEARCH_CANDIDATES),
+            ).fetchall()
+        return [
+            {"date": date, "direction": direction, "number": number, "hint": hint, "answer": answer, "title": title}
+            for date, direction, number, hint, answer, title in rows
+        ]
+
+    def clue_changes(self, since: int = 0) -> "ClueChanges":
+        """Puzzles written after write number ``since`` and their current clues.
+
+        Pass the returned ``seq`` back in to get only later writes. A puzzle
+        written again is listed again, and its clues replace the earlier ones.
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                """
+                SELECT w.seq, w.date, c.direction, c.number, c.answer
+                FROM puzzle_writes w LEFT JOIN clues c ON c.date = w.date
+                WHERE w.seq > ?
+                ORDER BY w.seq
+                """,
+                (since,),
+            ).fetchall()
+        dates = list(dict.fromkeys(date for _, date, _, _, _ in rows))
+        clues = [(date, direction, number, answer) for _, date, direction, number, answer in rows
+                 if direction is not None]
+        return ClueChanges(max([since] + [seq for seq, _, _, _, _ in rows]), dates, clues)
+
+    @contextmanager
+    def bulk_load(self):
+        """Suspend search index upkeep while writing many puzzles, then index them in one pass.
+
+        Maintaining the index row by row costs several times the plain inserts.
+        The triggers are dropped from the database file itself, so until the
+        block ends searches from every connection, such as a running server's,
+        miss or mismatch the puzzles written meanwhile. Load into a separate
+        file and swap it in to keep search working throughout.
+        """
+        with self._lock:
+            self.connection.executescript(
+                "DROP TRIGGER IF EXISTS clues_search_insert; DROP TRIGGER IF EXISTS clues_search_delete;"
+            )
+        try:
+            yield self
+        finally:
+            self.flush()
+            with self._lock:
+                self.connection.executescript(SEARCH_SCHEMA)
+            self.rebuild_search()
+
+    def rebuild_search(self) -> None:
+        """Re-index every clue, e.g. after a ``VACUUM`` has renumbered rows."""
+        with self._lock, self.connection:
+            self.connection.execute("INSERT INTO clue_search (clue_search) VALUES ('rebuild')")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+
+def _match_expression(query: str) -> str:
+    """FTS5 query requiring every word of ``query``; user input never reaches the query syntax.
+
+    Words are split where the unicode61 tokenizer splits them (``_`` included),
+    so each quoted string is one token: ``detail=column`` cannot run phrase queries.
+    """
+    return " ".join(f'"{word}"' for word in re.findall(r"[^\W_]+", query.lower()))
+
+
+class ClueChanges(NamedTuple):
+    """Result of ``SQLiteArchive.clue_changes``: ``(date, direction, number, answer)`` clue rows."""
+    seq: int
+    dates: List[str]
+    clues: List[tuple]
+
+
+class PuzzleRows(NamedTuple):
+    """Table rows for one puzzle, ready for ``SQLiteArchive.write_rows``."""
+    puzzle: tuple
+    authors: List[tuple]
+    clues: List[tuple]
+
+
+def puzzle_rows(crossword: Crossword, entries: Optional[List[Entry]] = None) -> PuzzleRows:
+    """Rows for ``crossword``; ``entries`` defaults to ``build_entries``, and to none if that fails."""
+    if entries is None:
+        try:
+            entries = build_entries(crossword)
+        except Exception as e:
+            print(f"Could not build entries for {crossword.date}: {e!r}")
+            entries = []
+    day = datetime.strptime(crossword.date, "%y%m%d").date()
+    return PuzzleRows(
+        (
+            crossword.date, day.isoformat(), day.weekday(), crossword.title,
+            json.dumps(crossword.authors), crossword.size.get('rows', len(crossword.grid)),
+            crossword.size.get('cols', 0), json.dumps(crossword.grid),
+        ),
+        [(author, crossword.date) for author in crossword.authors if author],
+        _clue_rows(crossword, entries),
+    )
+
+
+def _clue_rows(crossword: Crossword, entries: List[Entry]) -> List[tuple]:
+    """One row per clue, with the answer and position from ``entries`` when it has one."""
+    placed = {
+        direction: [entry for entry in entries if entry.direction == direction]
+        for direction in ("across", "down")
+    }
+    rows = []
+    for direction, clues in (("across", crossword.across), ("down", crossword.down)):
+        for position, clue in enumerate(clues):
+            if position < len(placed[direction]):
+                entry = placed[direction][position]
+                rows.append((crossword.date, direction, position, clue.hint,
+                             entry.index, entry.x, entry.y, entry.answer))
+            else:
+                rows.append((crossword.date, direction, position, clue.hint, None, None, None, None))
+    return rows
@@ -0,0 +1,186 @@
+"""
+Async serving mode: the puzzle endpoints run on the event loop with a shared
+``httpx.AsyncClient``, everything else is handed to the Flask app.
+
+    cd src && uvicorn crossword.asgi:app --workers 2
+"""
+import re
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from uvicorn.middleware.wsgi import WSGIMiddleware
+
+from . import app as flask_app
+from .async_reader import AsyncDataReader
+from .date_sampler import WEEKDAYS, held_dates
+from .metrics import metrics, server_timing, start_request_timing
+from .payload_parser import PayloadParseError
+from .puzzle_store import normalize_date
+from .resilience import CircuitOpenError, UpstreamBusyError, UpstreamError, UpstreamNotFoundError
+from .response_cache import CachedResponse
+from .serialization import accepts_compact, dumps_puzzle_list, puzzle_mimetype
+from .service import AsyncPuzzleService
+from .throttle import set_upstream_priority
+
+reader = AsyncDataReader(base_url=flask_app.base_url, store=flask_app.store, breaker=flask_app.reader.breaker,
+                         rate_limiter=flask_app.upstream_scheduler)
+# Shares the Flask service's caches so both modes serve the same ETags
+service = AsyncPuzzleService(reader, cache=flask_app.service.cache, shared=flask_app.service.shared)
+wsgi = WSGIMiddleware(flask_app.app)
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+class Request:
+    def __init__(self, scope):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.args = {key: values[0] for key, values in parse_qs(scope["query_string"].decode("latin-1")).items()}
+        self.headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+
+    @property
+    def compact(self) -> bool:
+        return accepts_compact(self.args.get("format"), self.headers.get("accept", ""))
+
+
+class Response:
+    def __init__(self, body, status: int = 200, content_type: str = "text/html; charset=utf-8",
+                 headers: Optional[dict] = None):
+        self.body = body.encode() if isinstance(body, str) else body
+        self.status = status
+        self.headers = {"content-type": content_type, **(headers or {})}
+
+    async def send(self, send, head: bool = False) -> None:
+        """Send the response; ``head`` keeps the headers (and length) but not the body."""
+        headers: Headers = [(key.encode("latin-1"), value.encode("latin-1")) for key, value in self.headers.items()]
+        headers.append((b"content-length", str(len(self.body)).encode()))
+        await send({"type": "http.response.start", "status": self.status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if head else self.body})
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == f'"{etag}"' for tag in tags)
+
+
+def puzzle_response(request: Request, cached: CachedResponse, cache_control: str) -> Response:
+    """Async twin of ``app.puzzle_response``: 304 when ``If-None-Match`` carries the ETag."""
+    headers = {"etag": f'"{cached.etag}"', "cache-control": cache_control, "vary": "Accept"}
+    if etag_matches(request.headers.get("if-none-match", ""), cached.etag):
+        return Response(b"", status=304, headers=headers)
+    return Response(cached.body, content_type=puzzle_mimetype(request.compact), headers=headers)
+
+
+async def get_crossword(request: Request, date: str) -> Response:
+    try:
+        content = await reader.fetch_data(date)
+    except ValueError:
+        return Response("Invalid date", 400)
+    return Response(content or "")
+
+
+async def get_puzzle(request: Request, date: str) -> Response:
+    try:
+        date = normalize_date(date)
+    except ValueError:
+        return Response("Invalid date", 400)
+    return puzzle_response(request, await service.get_puzzle(date, compact=request.compact), "public, max-age=86400")
+
+
+async def get_random_crossword(request: Request, weekday: str) -> Response:
+    """Same contract as the Flask route, including ``count``, ``exclude``, ``have`` and ``archived``."""
+    weekday = weekday.lower()
+    if weekday not in WEEKDAYS:
+        return Response("Invalid weekday")
+    exclude = [key for key in request.args.get("exclude", "").split(",") if key]
+    try:
+        held = held_dates(WEEKDAYS[weekday], request.args.get("have", ""))
+    except ValueError:
+        return Response("Invalid have bitmap", 400)
+    # Dates go to the sampler as they are, skipping a parse per held date
+    exclude += held
+    archived = request.args.get("archived") or reader.breaker.is_open
+    date_sampler = flask_app.archive_sampler if archived else flask_app.sampler
+    count = request.args.get("count")
+    if count is not None and count.lstrip("-").isdigit():
+        count = max(1, min(int(count), flask_app.MAX_BATCH_SIZE))
+        dates = [date.strftime("%y%m%d") for date in date_sampler.sample(WEEKDAYS[weekday], count, exclude)]
+        return Response(dumps_puzzle_list(await service.build_puzzles(dates, WEEKDAYS[weekday], request.compact)),
+                        content_type=puzzle_mimetype(request.compact), headers={"vary": "Accept"})
+
+    if not archived:
+        warmed = flask_app.warm_pool.pop(WEEKDAYS[weekday], exclude)
+        if warmed is not None:
+            date, cached = warmed
+            if request.compact:
+                cached = await service.get_puzzle(date, WEEKDAYS[weekday], compact=True)
+            return puzzle_response(request, cached, "no-cache")
+    dates = date_sampler.sample(WEEKDAYS[weekday], 1, exclude)
+    if not dates:
+        return Response("No crosswords left for this weekday", 404)
+    formatted_date = dates[0].strftime("%y%m%d")
+    cached = await service.get_puzzle(formatted_date, WEEKDAYS[weekday], request.compact)
+    return puzzle_response(request, cached, "no-cache")
+
+
+async def get_metrics(request: Request) -> Response:
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4")
+
+
+ROUTES = [
+    (re.compile(r"/crossword/([^/]+)"), get_crossword),
+    (re.compile(r"/puzzle/([^/]+)"), get_puzzle),
+    (re.compile(r"/random_crossword/([^/]+)"), get_random_crossword),
+    (re.compile(r"/metrics"), get_metrics),
+]
+
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await reader.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http":
+        for pattern, handler in ROUTES:
+            match = pattern.fullmatch(scope["path"])
+            if match:
+                return await handle(handler, match.groups(), scope, send)
+    await wsgi(scope, receive, send)
+
+
+async def handle(handler, params, scope, send) -> None:
+    started = time.perf_counter()
+    timings = start_request_timing()
+    request = Request(scope)
+    if request.method not in ("GET", "HEAD"):
+        # As in Flask, only GET and HEAD reach the handlers
+        return await Response("Method not allowed", 405, headers={"allow": "GET, HEAD"}).send(send)
+    set_upstream_priority(request.headers.get("x-crossword-priority", request.args.get("priority")))
+    try:
+        response = await handler(request, *params)
+    except PayloadParseError as error:
+        response = Response(f"Upstream returned a malformed puzzle (bad {error.section} section)", 502)
+    except UpstreamNotFoundError:
+        response = Response("No puzzle published for that date", 404)
+    except UpstreamError as error:
+        if isinstance(error, (CircuitOpenError, UpstreamBusyError)):
+            retry_after = error.retry_after
+        else:
+            retry_after = reader.breaker.reset_timeout
+        response = Response("Upstream is unavailable, try again later", 503,
+                            headers={"retry-after": str(max(1, round(retry_after)))})
+    if handler is not get_metrics:
+        metrics.observe("crossword_request_seconds", time.perf_counter() - started, endpoint=handler.__name__)
+        if timings:
+            response.headers["server-timing"] = server_timing(timings)
+    await response.send(send, head=request.method == "HEAD")
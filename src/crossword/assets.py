@@ -0,0 +1,66 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, NamedTuple, Optional
+
+# Already-compressed formats gain nothing from gzip
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+class Asset(NamedTuple):
+    """A static file held in memory, with its gzip variant when that is smaller."""
+    name: str
+    body: bytes
+    gzipped: Optional[bytes]
+    etag: str
+    mimetype: str
+
+
+def make_asset(name: str, body: bytes) -> Asset:
+    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    gzipped = None
+    if mimetype.startswith(COMPRESSIBLE):
+        # mtime=0 keeps the compressed bytes identical across restarts
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            gzipped = compressed
+    return Asset(name, body, gzipped, hashlib.blake2b(body, digest_size=8).hexdigest(), mimetype)
+
+
+class AssetManifest:
+    """Fingerprinted, precompressed copies of everything under a static folder.
+
+    ``main.js`` is published as ``main.<hash>.js``, so its URL changes whenever
+    its content does and responses can be cached forever. Files are read and
+    compressed once, when the manifest is built.
+    """
+
+    def __init__(self, static_folder: str, url_prefix: str = "/assets"):
+        self.static_folder = static_folder
+        self.url_prefix = url_prefix
+        self._urls: Dict[str, str] = {}
+        self._assets: Dict[str, Asset] = {}
+
+    def build(self) -> "AssetManifest":
+        for directory, _, files in os.walk(self.static_folder):
+            for file_name in files:
+                path = os.path.join(directory, file_name)
+                filename = os.path.relpath(path, self.static_folder).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    asset = make_asset(filename, f.read())
+                stem, extension = os.path.splitext(filename)
+                fingerprinted = f"{stem}.{asset.etag[:12]}{extension}"
+                self._assets[fingerprinted] = asset
+                self._urls[filename] = f"{self.url_prefix}/{fingerprinted}"
+        return self
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def url(self, filename: str) -> Optional[str]:
+        """Fingerprinted URL for a path relative to the static folder, if it exists."""
+        return self._urls.get(filename)
+
+    def get(self, fingerprinted: str) -> Optional[Asset]:
+        return self._assets.get(fingerprinted)
@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+
+from .data_reader import base_url
+from .metrics import metrics
+from .resilience import (
+    AsyncSingleFlight, CircuitBreaker, CircuitOpenError, UpstreamBusyError, UpstreamError, UpstreamNotFoundError,
+    backoff_delays, is_client_error,
+)
+from .throttle import INTERACTIVE, ShedError, upstream_priority
+
+
+class AsyncDataReader:
+    """Non-blocking counterpart of ``DataReader._fetch_data`` for the ASGI app.
+
+    One ``httpx.AsyncClient`` is shared by every request, so a single process
+    can keep many upstream fetches in flight; backoff waits with
+    ``asyncio.sleep`` instead of holding a worker thread. Pass the sync
+    reader's ``breaker`` and ``rate_limiter`` to share one view of upstream
+    health and one upstream budget.
+    """
+
+    def __init__(self, base_url=base_url, max_retries=5, backoff_factor=1, store=None,
+                 client=None, max_connections=100, breaker=None, rate_limiter=None):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.store = store
+        self.client = client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections), timeout=30.0
+        )
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.rate_limiter = rate_limiter
+        self._flight = AsyncSingleFlight()
+
+    async def fetch_data(self, date):
+        if self.store is not None:
+            # Disk reads and writes are quick but still blocking, so keep them off the loop
+            cached = await asyncio.to_thread(self.store.get, date)
+            if cached is not None:
+                metrics.inc("crossword_store_hits_total")
+                return cached
+            metrics.inc("crossword_store_misses_total")
+        try:
+            return await self._flight.do(date, lambda: self._fetch_upstream(date))
+        except UpstreamBusyError:
+            # Joined a prefetch that was shed; an interactive request goes again at its own priority
+            if upstream_priority() != INTERACTIVE:
+                raise
+            return await self._flight.do(date, lambda: self._fetch_upstream(date))
+
+    async def _fetch_upstream(self, date):
+        params = {"date": date}
+        delays = backoff_delays(self.backoff_factor, self.max_retries - 1)
+        for attempt in range(self.max_retries):
+            if self.breaker.is_open:
+                metrics.inc("crossword_circuit_rejected_total")
+                raise CircuitOpenError(date, self.breaker.retry_after())
+            # Wait for upstream budget before claiming the breaker: a fetch shed
+            # here must not be holding the half-open probe
+            if self.rate_limiter is not None:
+                try:
+                    await self.rate_limiter.acquire_async()
+                except ShedError as e:
+                    raise UpstreamBusyError(date, e.retry_after) from e
+            if not self.breaker.allow():
+                metrics.inc("crossword_circuit_rejected_total")
+                raise CircuitOpenError(date, self.breaker.retry_after())
+            try:
+                metrics.inc("crossword_upstream_requests_total")
+                with metrics.stage("upstream"):
+                    response = await self.client.get(self.base_url, params=params)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                if is_client_error(status):
+                    # Upstream is up and answered; asking again will not change the answer
+                    self.breaker.record_success()
+                    raise UpstreamNotFoundError(date, status) from e
+                self.breaker.record_failure()
+                delay = next(delays, None)
+                if delay is None or self.breaker.is_open:
+                    raise UpstreamError(date) from e
+                metrics.inc("crossword_upstream_retries_total")
+                print(f"Request failed: {e}, retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            if self.store is not None and response.text.strip():
+                await asyncio.to_thread(self.store.put, date, response.text)
+            return response.text
+
+    async def aclose(self):
+        await self.client.aclose()
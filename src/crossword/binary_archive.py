@@ -0,0 +1,304 @@
+"""
+Compact, memory-mapped puzzle archive.
+
+    python -m crossword.binary_archive puzzles.xwa --store ~/.cache/crossword/puzzles
+    python -m crossword.binary_archive puzzles.xwa --archive crossword_data.db
+
+Layout (little-endian):
+
+    header      magic, version, puzzle count, string table offset, string count
+    index       one fixed-size (yymmdd, offset, length) record per puzzle, sorted by date
+    puzzles     per puzzle: sizes; varint string ids for the title, authors and
+                each clue's words; a side table of cells that are not a single
+                A-Z letter (rebus cells); the black-square mask (1 bit per cell)
+                and the open cells' letters (5 bits each)
+    strings     offsets of every shared string, most used first, then their UTF-8 bytes
+
+Every lookup reads straight out of the mapped file: a binary search of the
+index, then the one puzzle record and the strings it refers to.
+"""
+import argparse
+import mmap
+import struct
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .crossword_builder import process_rebus_grid
+from .entity import Clue, Crossword
+
+MAGIC = b"XWA1"
+VERSION = 1
+HEADER = struct.Struct("<4sHIII")
+INDEX_ENTRY = struct.Struct("<6sII")
+PUZZLE = struct.Struct("<HHBBBHHHI")
+
+# 5-bit letter codes; 0 marks a cell whose content is in the side table
+LETTER_BITS = 5
+LETTER_MASK = (1 << LETTER_BITS) - 1
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LETTER_CODES = {letter: code for code, letter in enumerate(LETTERS, start=1)}
+
+
+class StringTable:
+    """Deduplicated strings, addressed by id; the most used strings get the smallest ids."""
+
+    def __init__(self, counts: Counter):
+        self.strings = [text.encode("utf-8") for text, _ in counts.most_common()]
+        self.ids = {text: string_id for string_id, (text, _) in enumerate(counts.most_common())}
+
+    def pack(self) -> bytes:
+        offsets, position = [], 0
+        for data in self.strings:
+            offsets.append(position)
+            position += len(data)
+        offsets.append(position)
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(self.strings)
+
+
+def _strings(crossword: Crossword, grid: List[str], rebus_map: Dict[Tuple[int, int], str]) -> Iterator[str]:
+    """Every string-table entry a puzzle uses: title, authors, clue words and odd cells."""
+    yield crossword.title
+    yield from crossword.authors
+    for clue in crossword.across + crossword.down:
+        yield from clue.hint.split(" ")
+    for y, row in enumerate(grid):
+        for x, char in enumerate(row):
+            if char != "#" and char not in LETTER_CODES:
+                yield rebus_map.get((x, y), char) if char == "+" else char
+
+
+def pack_crossword(crossword: Crossword, grid: List[str], rebus_map: Dict[Tuple[int, int], str],
+                   strings: StringTable) -> bytes:
+    """Encode one puzzle record from its ``process_rebus_grid`` output."""
+    width = len(grid[0]) if grid else 0
+    if any(len(row) != width for row in grid):
+        raise ValueError(f"Grid for {crossword.date} is not rectangular")
+
+    mask = 0
+    letters = 0
+    open_cells = 0
+    side: List[Tuple[int, int]] = []
+    for y, row in enumerate(grid):
+        for x, char in enumerate(row):
+            if char == "#":
+                mask |= 1 << (y * width + x)
+                continue
+            code = LETTER_CODES.get(char, 0)
+            if not code:
+                side.append((open_cells, strings.ids[rebus_map.get((x, y), char) if char == "+" else char]))
+            letters |= code << (LETTER_BITS * open_cells)
+            open_cells += 1
+
+    clues = [clue.hint.split(" ") for clue in crossword.across + crossword.down]
+    if any(len(words) > 255 for words in clues):
+        raise ValueError(f"A clue for {crossword.date} has more than 255 words")
+    # Every string id goes in one varint stream, so reading it back is a single loop.
+    # Clues are stored as word ids: clue words repeat far more often than whole clues
+    stream = bytearray()
+    for string_id in [strings.ids[crossword.title], *(strings.ids[author] for author in crossword.authors),
+                      *(strings.ids[word] for words in clues for word in words),
+                      *(value for entry in side for value in entry)]:
+        _write_varint(stream, string_id)
+
+    record = bytearray(PUZZLE.pack(
+        crossword.size.get("rows", len(grid)), crossword.size.get("cols", width), len(grid), width,
+        len(crossword.authors), len(crossword.across), len(crossword.down), len(side), len(stream),
+    ))
+    record += bytes(len(words) for words in clues)
+    record += stream
+    record += mask.to_bytes(_mask_bytes(len(grid) * width), "little")
+    record += letters.to_bytes(_letter_bytes(open_cells), "little")
+    return bytes(record)
+
+
+def write_archive(path: str, crosswords: Iterable[Crossword]) -> int:
+    """Write ``crosswords`` to a new archive at ``path``; returns the number of puzzles.
+
+    The format is write-once: to add puzzles, write a new archive including the
+    old ones (``BinaryArchive.crosswords`` reads them back).
+    """
+    puzzles = {}
+    counts: Counter = Counter()
+    for crossword in crosswords:
+        grid, rebus_map = process_rebus_grid(crossword.grid)
+        puzzles[crossword.date] = (crossword, grid, rebus_map)
+    for crossword, grid, rebus_map in puzzles.values():
+        counts.update(_strings(crossword, grid, rebus_map))
+    strings = StringTable(counts)
+
+    dates = sorted(puzzles)
+    records = [pack_crossword(*puzzles[date], strings) for date in dates]
+    offset = HEADER.size + INDEX_ENTRY.size * len(dates)
+    index = []
+    for date, record in zip(dates, records):
+        index.append(INDEX_ENTRY.pack(date.encode("ascii"), offset, len(record)))
+        offset += len(record)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(dates), offset, len(strings.strings)))
+        f.write(b"".join(index))
+        f.writelines(records)
+        f.write(strings.pack())
+    return len(dates)
+
+
+class BinaryArchive:
+    """Read-only, memory-mapped view of an archive written by ``write_archive``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count, self._strings_offset, self._string_count = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} puzzle archive")
+        self._string_data = self._strings_offset + 4 * (self._string_count + 1)
+        # Decoded strings; clue words are shared across puzzles so this stays small
+        self._decoded: Dict[int, str] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, date: str) -> bool:
+        return self._find(date) is not None
+
+    def dates(self) -> List[str]:
+        return [self._date_at(i) for i in range(self._count)]
+
+    def get(self, date: str) -> Optional[Crossword]:
+        """The ``Crossword`` for a ``yymmdd`` date, or None if it is not archived."""
+        found = self._find(date)
+        if found is None:
+            return None
+        offset, length = found
+        record = self._mm[offset:offset + length]
+        size_rows, size_cols, height, width, n_authors, n_across, n_down, n_side, stream_length = \
+            PUZZLE.unpack_from(record)
+        position = PUZZLE.size
+        word_counts = record[position:position + n_across + n_down]
+        position += len(word_counts)
+        values = _read_varints(record[position:position + stream_length])
+        position += stream_length
+
+        texts = [self._string(string_id) for string_id in values[:len(values) - 2 * n_side]]
+        title, authors = texts[0], texts[1:1 + n_authors]
+        clues, start = [], 1 + n_authors
+        for n_words in word_counts:
+            clues.append(Clue(hint=" ".join(texts[start:start + n_words])))
+            start += n_words
+        side_values = values[len(texts):]
+        side = {side_values[i]: self._string(side_values[i + 1]) for i in range(0, len(side_values), 2)}
+        cells = height * width
+        mask = int.from_bytes(record[position:position + _mask_bytes(cells)], "little")
+        letters = int.from_bytes(record[position + _mask_bytes(cells):], "little")
+
+        grid, open_cell = [], 0
+        for y in range(height):
+            row = []
+            for x in range(width):
+                if mask >> (y * width + x) & 1:
+                    row.append("#")
+                    continue
+                code = letters >> (LETTER_BITS * open_cell) & LETTER_MASK
+                row.append(LETTERS[code - 1] if code else ",".join(side[open_cell]))
+                open_cell += 1
+            grid.append("".join(row))
+
+        return Crossword(
+            date=date,
+            title=title,
+            authors=authors,
+            size={"rows": size_rows, "cols": size_cols},
+            grid=grid,
+            across=clues[:n_across],
+            down=clues[n_across:],
+        )
+
+    def crosswords(self) -> Iterable[Crossword]:
+        for date in self.dates():
+            yield self.get(date)
+
+    def _find(self, date: str) -> Optional[Tuple[int, int]]:
+        key = date.encode("ascii")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry_date, offset, length = INDEX_ENTRY.unpack_from(self._mm, HEADER.size + INDEX_ENTRY.size * middle)
+            if entry_date == key:
+                return offset, length
+            if entry_date < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _date_at(self, i: int) -> str:
+        return INDEX_ENTRY.unpack_from(self._mm, HEADER.size + INDEX_ENTRY.size * i)[0].decode("ascii")
+
+    def _string(self, string_id: int) -> str:
+        text = self._decoded.get(string_id)
+        if text is None:
+            start, end = struct.unpack_from("<2I", self._mm, self._strings_offset + 4 * string_id)
+            text = self._decoded[string_id] = self._mm[self._string_data + start:self._string_data + end].decode("utf-8")
+        return text
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(data: bytes) -> List[int]:
+    values = []
+    value = shift = 0
+    for byte in data:
+        if byte < 0x80:
+            values.append(value | byte << shift)
+            value = shift = 0
+        else:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+    return values
+
+
+def _mask_bytes(cells: int) -> int:
+    return (cells + 7) // 8
+
+
+def _letter_bytes(open_cells: int) -> int:
+    return (open_cells * LETTER_BITS + 7) // 8
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a compact binary puzzle archive.")
+    parser.add_argument("path", help="archive file to write")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--store", help="PuzzleStore directory of upstream payloads")
+    source.add_argument("--archive", help="SQLite archive written by the harvester")
+    args = parser.parse_args(argv)
+
+    if args.store:
+        from .puzzle_store import PuzzleStore
+        store = PuzzleStore(args.store)
+        crosswords = (Crossword.from_api_response(store.get(date)) for date in store.dates())
+    else:
+        from .archive import SQLiteArchive
+        archive = SQLiteArchive(args.archive)
+        crosswords = (archive.get(row["date"]) for row in archive.find())
+    count = write_archive(args.path, crosswords)
+    print(f"Wrote {count} puzzles to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,49 @@
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
 
 from datetime import timedelta
 from time import sleep
 
+from .metrics import metrics
+from .resilience import (
+    CircuitBreaker, CircuitOpenError, SingleFlight, UpstreamBusyError, UpstreamError, UpstreamNotFoundError,
+    backoff_delays, is_client_error,
+)
+from .throttle import INTERACTIVE, ShedError, upstream_priority
+
 base_url = "https://nytsyn.pzzl.com/nytsyn-crossword-mh/nytsyncrossword"
 
 
-def already_fetched(date):
-    return False  # Placeholder implementation; check if data already exists for the given date
+def already_fetched(date, store=None):
+    return store is not None and date in store
+
+
+def make_session(pool_size=10):
+    """A requests session whose connection pool can serve ``pool_size`` threads at once."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 class DataReader:
-    def __init__(self, base_url=base_url, max_retries=5, backoff_factor=1):
+    def __init__(self, base_url=base_url, max_retries=5, backoff_factor=1, store=None,
+                 session=None, rate_limiter=None, breaker=None):
         self.base_url = base_url
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
+        self.store = store
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._flight = SingleFlight()
 
     def fetch_data(self, start_date, end_date):
         for date in self.daterange(start_date, end_date):
-            if not already_fetched(date):
+            if not already_fetched(date, self.store):
                 data = self._fetch_data(date)
                 yield data
 
@@ -29,15 +52,60 @@ class DataReader:
             yield (start_date + timedelta(n)).strftime("%Y%m%d")
 
     def _fetch_data(self, date):
+        if self.store is not None:
+            cached = self.store.get(date)
+            if cached is not None:
+                metrics.inc("crossword_store_hits_total")
+                return cached
+            metrics.inc("crossword_store_misses_total")
+        # Concurrent requests for the same date share one upstream round trip
+        try:
+            return self._flight.do(date, lambda: self._fetch_upstream(date))
+        except UpstreamBusyError:
+            # Joined a prefetch that was shed; an interactive request goes again at its own priority
+            if upstream_priority() != INTERACTIVE:
+                raise
+            return self._flight.do(date, lambda: self._fetch_upstream(date))
+
+    def _fetch_upstream(self, date):
+        """Fetch ``date`` from upstream, raising ``UpstreamError`` once retries run out."""
         params = {"date": date}
-        for i in range(self.max_retries):
+        delays = backoff_delays(self.backoff_factor, self.max_retries - 1)
+        for attempt in range(self.max_retries):
+            if self.breaker.is_open:
+                metrics.inc("crossword_circuit_rejected_total")
+                raise CircuitOpenError(date, self.breaker.retry_after())
+            # Wait for upstream budget before claiming the breaker: a fetch shed
+            # here must not be holding the half-open probe
+            if self.rate_limiter is not None:
+                try:
+                    self.rate_limiter.acquire()
+                except ShedError as e:
+                    raise UpstreamBusyError(date, e.retry_after) from e
+            if not self.breaker.allow():
+                metrics.inc("crossword_circuit_rejected_total")
+                raise CircuitOpenError(date, self.breaker.retry_after())
             try:
-                response = requests.get(self.base_url, params=params)
+                http = self.session if self.session is not None else requests
+                metrics.inc("crossword_upstream_requests_total")
+                with metrics.stage("upstream"):
+                    response = http.get(self.base_url, params=params)
                 response.raise_for_status()
-                return response.text
             except RequestException as e:
-                print(
-                    f"Request failed: {e}, retrying in {self.backoff_factor} seconds..."
-                )
-                sleep(self.backoff_factor)
-                self.backoff_factor *= 2
+                status = getattr(e.response, "status_code", None)
+                if is_client_error(status):
+                    # Upstream is up and answered; asking again will not change the answer
+                    self.breaker.record_success()
+                    raise UpstreamNotFoundError(date, status) from e
+                self.breaker.record_failure()
+                delay = next(delays, None)
+                if delay is None or self.breaker.is_open:
+                    raise UpstreamError(date) from e
+                metrics.inc("crossword_upstream_retries_total")
+                print(f"Request failed: {e}, retrying in {delay:.1f} seconds...")
+                sleep(delay)
+                continue
+            self.breaker.record_success()
+            if self.store is not None and response.text.strip():
+                self.store.put(date, response.text)
+            return response.text
@@ -0,0 +1,172 @@
+import base64
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Union
+
+from .puzzle_store import normalize_date
+
+ARCHIVE_START = date(2010, 1, 1)
+# Longest ``?have=`` bitmap accepted: over a century of one weekday
+MAX_HELD_LENGTH = 1024
+
+WEEKDAYS = {
+    'monday': 0,
+    'tuesday': 1,
+    'wednesday': 2,
+    'thursday': 3,
+    'friday': 4,
+    'saturday': 5,
+    'sunday': 6
+}
+
+
+def parse_key(key: str) -> date:
+    """Turn a ``yymmdd`` puzzle key back into a date."""
+    return datetime.strptime(key, "%y%m%d").date()
+
+
+def _first_weekday(weekday: int) -> date:
+    return ARCHIVE_START + timedelta(days=(weekday - ARCHIVE_START.weekday()) % 7)
+
+
+def encode_held(weekday: int, days: Iterable[date]) -> str:
+    """Bitmap of ``days`` for ``held_dates``; days before ``ARCHIVE_START`` or on other weekdays are left out."""
+    first = _first_weekday(weekday)
+    bits = bytearray()
+    for day in days:
+        offset = (day - first).days
+        if offset < 0 or offset % 7:
+            continue
+        k = offset // 7
+        if k >> 3 >= len(bits):
+            bits.extend(bytes((k >> 3) + 1 - len(bits)))
+        bits[k >> 3] |= 1 << (k & 7)
+    return base64.urlsafe_b64encode(bytes(bits)).rstrip(b"=").decode("ascii")
+
+
+def held_dates(weekday: int, bitmap: str) -> List[date]:
+    """Dates a client already has, from the ``?have=`` bitmap it sends with random puzzle requests.
+
+    Bit ``k`` (least significant bit first) stands for the ``k``-th ``weekday`` on
+    or after ``ARCHIVE_START``, and the bytes are base64url without padding, so
+    sixteen years of one weekday fit in about 140 characters. Raises
+    ``ValueError`` if the bitmap is not valid base64 or is over ``MAX_HELD_LENGTH``.
+    """
+    if len(bitmap) > MAX_HELD_LENGTH:
+        raise ValueError(f"Held-dates bitmap is over {MAX_HELD_LENGTH} characters")
+    try:
+        bits = base64.b64decode(bitmap + "=" * (-len(bitmap) % 4), altchars=b"-_", validate=True)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid held-dates bitmap: {bitmap!r}") from e
+    first = _first_weekday(weekday)
+    return [
+        first + timedelta(weeks=i * 8 + bit)
+        for i, byte in enumerate(bits) if byte
+        for bit in range(8) if byte >> bit & 1
+    ]
+
+
+class _WeekdayRange:
+    """Every ``weekday`` in ``[begin, end)``, addressed by position without materializing it."""
+
+    def __init__(self, weekday: int, begin: date, end: date):
+        self.first = begin + timedelta(days=(weekday - begin.weekday()) % 7)
+        self.size = max(0, ((end - self.first).days + 6) // 7)
+
+    def at(self, i: int) -> date:
+        return self.first + timedelta(weeks=i)
+
+    def position(self, day: date) -> Optional[int]:
+        offset = (day - self.first).days
+        if offset < 0 or offset % 7 or offset // 7 >= self.size:
+            return None
+        return offset // 7
+
+
+class _ListedRange:
+    """Known dates for one weekday, e.g. the puzzles held in the local archive."""
+
+    def __init__(self, days: List[date]):
+        self.days = days
+        self.size = len(days)
+        self._positions = {day: i for i, day in enumerate(days)}
+
+    def at(self, i: int) -> date:
+        return self.days[i]
+
+    def position(self, day: date) -> Optional[int]:
+        return self._positions.get(day)
+
+
+class WeekdaySampler:
+    """Pick uniformly random puzzle dates for a weekday in constant time.
+
+    Without ``available`` every date from ``begin`` up to (not including) today is
+    a candidate. With ``available`` (any sized iterable of ``yymmdd`` keys, such as
+    a ``PuzzleStore``) sampling is restricted to those dates; the per-weekday index
+    is rebuilt only when ``available`` changes, going by its ``version`` counter
+    where it has one (a ``PuzzleStore`` does) and by its size otherwise.
+    """
+
+    def __init__(self, begin: date = ARCHIVE_START, end: Optional[date] = None, available=None):
+        self.begin = begin
+        self.end = end
+        self.available = available
+        self._listed: Dict[int, _ListedRange] = {}
+        self._listed_version = None
+
+    def sample(self, weekday: int, k: int = 1, exclude: Iterable[Union[str, date]] = ()) -> List[date]:
+        """Return up to ``k`` distinct dates for ``weekday``, skipping ``exclude`` (``yymmdd`` keys or dates)."""
+        candidates = self._range(weekday)
+        excluded = set()
+        for key in exclude:
+            try:
+                position = candidates.position(key if isinstance(key, date) else parse_key(normalize_date(key)))
+            except ValueError:
+                continue
+            if position is not None:
+                excluded.add(position)
+
+        k = min(k, candidates.size - len(excluded))
+        if k <= 0:
+            return []
+        if len(excluded) > candidates.size // 2:
+            # Dense exclusion: rejection sampling would spin, so enumerate what is left
+            remaining = [i for i in range(candidates.size) if i not in excluded]
+            return [candidates.at(i) for i in random.sample(remaining, k)]
+        chosen = []
+        seen = set(excluded)
+        while len(chosen) < k:
+            i = random.randrange(candidates.size)
+            if i not in seen:
+                seen.add(i)
+                chosen.append(i)
+        return [candidates.at(i) for i in chosen]
+
+    def count(self, weekday: int) -> int:
+        """Number of candidate dates for ``weekday``."""
+        return self._range(weekday).size
+
+    def _range(self, weekday: int):
+        if self.available is None:
+            return _WeekdayRange(weekday, self.begin, self.end or date.today())
+        version = self._available_version()
+        if self._listed_version != version:
+            self._index_available(version)
+        return self._listed.get(weekday) or _ListedRange([])
+
+    def _available_version(self):
+        version = getattr(self.available, "version", None)
+        return len(self.available) if version is None else version
+
+    def _index_available(self, version) -> None:
+        # Read the version first: a change that lands in between only costs another rebuild
+        keys = self.available.dates() if hasattr(self.available, "dates") else sorted(self.available)
+        by_weekday: Dict[int, List[date]] = {}
+        end = self.end or date.today()
+        for key in keys:
+            day = parse_key(key)
+            if self.begin <= day < end:
+                by_weekday.setdefault(day.weekday(), []).append(day)
+        self._listed = {weekday: _ListedRange(days) for weekday, days in by_weekday.items()}
+        self._listed_version = version
@@ -1,6 +1,8 @@
-from typing import List
+from typing import List, NamedTuple
 from pydantic import BaseModel
 
+from .payload_parser import parse_payload
+
 
 class CrosswordEntry(BaseModel):
     """A single entry in a crossword puzzle."""
@@ -18,6 +20,15 @@ class CrosswordEntry(BaseModel):
         return self.dict()
 
 
+class Entry(NamedTuple):
+    """Validation-free counterpart of ``CrosswordEntry`` used on the serving hot path."""
+    clue: str
+    answer: str
+    index: int
+    x: int
+    y: int
+    direction: str
+
 
 class Clue(BaseModel):
     hint: str
@@ -34,37 +45,15 @@ class Crossword(BaseModel):
 
     @classmethod
     def from_api_response(cls, data):
-        lines = data.strip().split('\n\n')
-
-        date = lines[1].strip()
-        title = lines[2].strip()
-        authors = [author.strip() for author in lines[3].split('/')]
-        size = {'rows': int(lines[4].strip()), 'cols': int(lines[5].strip())}
-
-        # Determine the index where the grid starts and ends
-        grid_raw= lines[8]
-        grid = []
-        for line in grid_raw.split('\n'):
-            grid.append(line)
-
-        # Separate the clues into Across and Down
-        clue_text = data.split('org.apache')[0]  # To remove any trailing server logs or irrelevant text
-        clue_parts = clue_text.split('\n\n')
-        across_text = clue_parts[-2].strip()  # Assuming the third last part after grid contains Across clues
-        down_text = clue_parts[-1].strip()  # Assuming the second last part contains Down clues
+        """Parse an upstream payload: a string, bytes, or an iterable of chunks (file, streamed body).
 
-        across_clues = [Clue(hint=hint) for hint in across_text.split('\n') if hint.strip()]
-        down_clues = [Clue(hint=hint) for hint in down_text.split('\n') if hint.strip()]
+        Raises ``PayloadParseError`` if the payload is truncated or malformed.
+        """
+        fields = parse_payload(data)
+        fields["across"] = [Clue(hint=hint) for hint in fields["across"]]
+        fields["down"] = [Clue(hint=hint) for hint in fields["down"]]
+        return cls(**fields)
 
-        return cls(
-            date=date,
-            title=title,
-            authors=authors,
-            size=size,
-            grid=grid,
-            across=across_clues,
-            down=down_clues
-        )
     def __str__(self):
         # Some verticality please
         grid = '\n'.join(self.grid)
@@ -0,0 +1,207 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Tuple
+
+from .metrics import metrics
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; analyze_grids falls back to analyze_grid
+    np = None
+
+
+class WordSpan(NamedTuple):
+    """A numbered word slot: its clue number, start cell and length in cells."""
+    number: int
+    x: int
+    y: int
+    length: int
+
+
+class GridLayout(NamedTuple):
+    """Numbering and word slots of a processed grid (rebus cells already collapsed to ``+``)."""
+    width: int
+    height: int
+    across: List[WordSpan]
+    down: List[WordSpan]
+
+
+def analyze_grid(rows: List[str]) -> GridLayout:
+    """Number the grid and find every across and down word in a single pass.
+
+    A cell gets the next number when it is open and has a black square or the
+    grid edge to its left or above. The grid width is taken from the first row.
+    """
+    height = len(rows)
+    width = len(rows[0]) if rows else 0
+    across, down = [], []
+    number = 0
+    for y, row in enumerate(rows):
+        above = rows[y - 1] if y else ""
+        limit = min(width, len(row))
+        for x in range(limit):
+            if row[x] == "#":
+                continue
+            starts_across = x == 0 or row[x - 1] == "#"
+            starts_down = y == 0 or (x < len(above) and above[x] == "#")
+            if not (starts_across or starts_down):
+                continue
+            number += 1
+            if starts_across:
+                end = x + 1
+                while end < limit and row[end] != "#":
+                    end += 1
+                across.append(WordSpan(number, x, y, end - x))
+            if starts_down:
+                end = y + 1
+                while end < height and x < len(rows[end]) and rows[end][x] != "#":
+                    end += 1
+                down.append(WordSpan(number, x, y, end - y))
+    return GridLayout(width, height, across, down)
+
+
+# Maps every byte to "." except "#" and the row separator, leaving only the shape
+_MASK = bytes.maketrans(bytes(range(256)), bytes(b if b in b"#\n" else ord(".") for b in range(256)))
+
+
+def shape_key(rows: List[str]) -> bytes:
+    """Fingerprint of a processed grid's black-square pattern (and row lengths), letters ignored."""
+    # latin-1 with "replace" keeps one byte per cell whatever the characters are
+    return "\n".join(rows).encode("latin-1", "replace").translate(_MASK)
+
+
+class LayoutCache:
+    """Bounded LRU of ``analyze_grid`` results keyed by ``shape_key``.
+
+    Numbering and word spans depend only on where the black squares are, and
+    published puzzles reuse a small set of shapes, so most builds only have to
+    fill in letters and clues. Cached layouts are shared: do not modify them.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._layouts: "OrderedDict[bytes, GridLayout]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def layout(self, rows: List[str]) -> GridLayout:
+        key = shape_key(rows)
+        with self._lock:
+            layout = self._layouts.get(key)
+            if layout is not None:
+                self._layouts.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.inc("crossword_layout_cache_hits_total" if layout else "crossword_layout_cache_misses_total")
+        if layout is None:
+            layout = analyze_grid(rows)
+            with self._lock:
+                self._layouts[key] = layout
+                while len(self._layouts) > self.max_entries:
+                    self._layouts.popitem(last=False)
+        return layout
+
+    def layouts(self, grids: List[List[str]]) -> List[GridLayout]:
+        """``layout`` for many grids, analyzing the ones not cached together with ``analyze_grids``."""
+        keys = [shape_key(rows) for rows in grids]
+        with self._lock:
+            found = [self._layouts.get(key) for key in keys]
+            for key, layout in zip(keys, found):
+                if layout is not None:
+                    self._layouts.move_to_end(key)
+        # First grid of each missing shape; later grids of that shape count as hits
+        missing = {}
+        for i, layout in enumerate(found):
+            if layout is None:
+                missing.setdefault(keys[i], i)
+        with self._lock:
+            self.hits += len(grids) - len(missing)
+            self.misses += len(missing)
+        metrics.inc("crossword_layout_cache_hits_total", len(grids) - len(missing))
+        metrics.inc("crossword_layout_cache_misses_total", len(missing))
+        if not missing:
+            return found
+        analyzed = dict(zip(missing, analyze_grids([grids[i] for i in missing.values()])))
+        with self._lock:
+            self._layouts.update(analyzed)
+            while len(self._layouts) > self.max_entries:
+                self._layouts.popitem(last=False)
+        return [layout if layout is not None else analyzed[key] for key, layout in zip(keys, found)]
+
+
+layout_cache = LayoutCache()
+
+
+def analyze_grids(grids: List[List[str]]) -> List[GridLayout]:
+    """Analyze many grids at once, vectorized with NumPy when it is installed.
+
+    Rectangular grids are grouped by shape and numbered together; anything else
+    goes through ``analyze_grid``. Results are identical either way.
+    """
+    if np is None:
+        return [analyze_grid(rows) for rows in grids]
+    layouts: List[GridLayout] = [None] * len(grids)
+    by_shape: Dict[Tuple[int, int], List[int]] = {}
+    for i, rows in enumerate(grids):
+        width = len(rows[0]) if rows else 0
+        if width and all(len(row) == width for row in rows):
+            by_shape.setdefault((len(rows), width), []).append(i)
+        else:
+            layouts[i] = analyze_grid(rows)
+    for (height, width), indices in by_shape.items():
+        for i, layout in zip(indices, _analyze_same_shape([grids[i] for i in indices], height, width)):
+            layouts[i] = layout
+    return layouts
+
+
+def _analyze_same_shape(grids: List[List[str]], height: int, width: int) -> List[GridLayout]:
+    text = "".join("".join(rows) for rows in grids)
+    cells = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    is_open = (cells != ord("#")).reshape(len(grids), height, width)
+
+    blocked_left = np.ones_like(is_open)
+    blocked_left[:, :, 1:] = ~is_open[:, :, :-1]
+    blocked_above = np.ones_like(is_open)
+    blocked_above[:, 1:, :] = ~is_open[:, :-1, :]
+    starts_across = is_open & blocked_left
+    starts_down = is_open & blocked_above
+    numbers = np.cumsum((starts_across | starts_down).reshape(len(grids), -1), axis=1)
+
+    # Run length of open cells from each cell to the right / downwards
+    run_across = np.zeros(is_open.shape, dtype=np.int32)
+    run_across[:, :, -1] = is_open[:, :, -1]
+    for x in range(width - 2, -1, -1):
+        run_across[:, :, x] = is_open[:, :, x] * (run_across[:, :, x + 1] + 1)
+    run_down = np.zeros(is_open.shape, dtype=np.int32)
+    run_down[:, -1, :] = is_open[:, -1, :]
+    for y in range(height - 2, -1, -1):
+        run_down[:, y, :] = is_open[:, y, :] * (run_down[:, y + 1, :] + 1)
+
+    layouts = []
+    for b in range(len(grids)):
+        spans = []
+        for starts, runs in ((starts_across[b], run_across[b]), (starts_down[b], run_down[b])):
+            flat = np.flatnonzero(starts)
+            spans.append([
+                WordSpan(number, x, y, length)
+                for number, x, y, length in zip(
+                    numbers[b, flat].tolist(), (flat % width).tolist(),
+                    (flat // width).tolist(), runs.reshape(-1)[flat].tolist(),
+                )
+            ])
+        layouts.append(GridLayout(width, height, spans[0], spans[1]))
+    return layouts
+
+
+metrics.describe("crossword_layout_cache_hits_total", "Grid layouts reused from a puzzle with the same black squares.")
+metrics.describe("crossword_layout_cache_misses_total", "Grid layouts that had to be analyzed.")
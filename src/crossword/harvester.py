@@ -0,0 +1,168 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from .data_reader import DataReader, already_fetched, make_session
+from .entity import Crossword
+from .resilience import CircuitBreaker, UpstreamError
+from .throttle import RateLimiter
+
+
+class Checkpoint:
+    """Dates already harvested, persisted as JSON so an interrupted run can resume."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.done: Set[str] = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = set(json.load(f)["done"])
+
+    def __contains__(self, date: str) -> bool:
+        return date in self.done
+
+    def mark(self, date: str) -> None:
+        self.done.add(date)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with open(self.path + ".tmp", "w") as f:
+            json.dump({"done": sorted(self.done)}, f)
+        os.replace(self.path + ".tmp", self.path)
+
+
+class Harvester:
+    """Bulk counterpart to ``DataReader.fetch_data`` that fetches dates concurrently.
+
+    At most ``workers`` requests are in flight and the reader's rate limiter caps
+    the request rate across all of them. Completed dates are written to the
+    checkpoint every ``checkpoint_every`` puzzles, so rerunning the same range
+    only fetches what is missing. While the reader's circuit breaker is open a
+    worker waits for it to close and tries its date again, up to
+    ``max_circuit_waits`` times, so an upstream outage pauses the run instead of
+    failing every remaining date. Failed dates are left out of the checkpoint
+    and retried on the next run.
+    """
+
+    def __init__(self, reader: DataReader, workers: int = 8, checkpoint: Optional[Checkpoint] = None,
+                 checkpoint_every: int = 25, report_every: int = 50, max_circuit_waits: int = 20):
+        self.reader = reader
+        self.workers = workers
+        self.checkpoint = checkpoint or Checkpoint()
+        self.checkpoint_every = checkpoint_every
+        self.report_every = report_every
+        self.max_circuit_waits = max_circuit_waits
+
+    def run(self, start_date, end_date, writer=None) -> Dict[str, float]:
+        """Harvest every date in the range, passing parsed puzzles to ``writer.save``.
+
+        Without a writer, dates already in the reader's store are skipped. With
+        one they are still saved, parsed from the store without going upstream.
+        """
+        dates = [
+            date for date in self.reader.daterange(start_date, end_date)
+            if date not in self.checkpoint and (writer is not None or not already_fetched(date, self.reader.store))
+        ]
+        stats = {"total": len(dates), "fetched": 0, "failed": 0}
+        print(f"Harvesting {len(dates)} dates with {self.workers} workers...")
+        started = time.monotonic()
+        pending = {}
+        remaining = iter(dates)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                # Keep the queue short so an interrupt loses little queued work
+                while len(pending) < self.workers * 2:
+                    date = next(remaining, None)
+                    if date is None:
+                        break
+                    pending[pool.submit(self._fetch, date)] = date
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    date = pending.pop(future)
+                    try:
+                        crossword = future.result()
+                    except Exception as e:
+                        print(f"Failed to harvest {date}: {e!r}")
+                        stats["failed"] += 1
+                        continue
+                    if writer is not None:
+                        writer.save(crossword)
+                    self.checkpoint.mark(date)
+                    stats["fetched"] += 1
+                    if stats["fetched"] % self.checkpoint_every == 0:
+                        self.checkpoint.save()
+                    if stats["fetched"] % self.report_every == 0:
+                        self._report(stats, started)
+        self.checkpoint.save()
+        stats["seconds"] = time.monotonic() - started
+        self._report(stats, started)
+        return stats
+
+    def _fetch(self, date: str) -> Crossword:
+        breaker = self.reader.breaker
+        for waits in range(self.max_circuit_waits + 1):
+            try:
+                return Crossword.from_api_response(self.reader._fetch_data(date))
+            except UpstreamError:
+                # Includes the fetch that opened the circuit; retry once upstream is probed again
+                if breaker.state == CircuitBreaker.CLOSED or waits == self.max_circuit_waits:
+                    raise
+                time.sleep(max(breaker.retry_after(), 0.01))
+
+    def _report(self, stats: Dict[str, float], started: float) -> None:
+        elapsed = time.monotonic() - started
+        done = stats["fetched"] + stats["failed"]
+        rate = done / elapsed if elapsed else 0.0
+        eta = (stats["total"] - done) / rate if rate else 0.0
+        print(
+            f"{done}/{stats['total']} dates ({stats['failed']} failed), "
+            f"{rate:.1f} puzzles/s, ~{eta:.0f}s remaining"
+        )
+
+
+def main(start_date, end_date, workers=8, rate=5.0, checkpoint_path="harvest_checkpoint.json",
+         store=None, writer=None):
+    reader = DataReader(
+        store=store,
+        session=make_session(workers),
+        rate_limiter=RateLimiter(rate, burst=workers),
+    )
+    harvester = Harvester(reader, workers=workers, checkpoint=Checkpoint(checkpoint_path))
+    return harvester.run(start_date, end_date, writer)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .archive import SQLiteArchive
+    from .puzzle_store import PuzzleStore
+
+    parser = argparse.ArgumentParser(description="Backfill the puzzle store from upstream.")
+    parser.add_argument("store", help="PuzzleStore directory to fill")
+    parser.add_argument("start", help="first date, YYYYMMDD")
+    parser.add_argument("end", help="last date, YYYYMMDD")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=5.0, help="upstream requests per second")
+    parser.add_argument("--checkpoint", default="harvest_checkpoint.json")
+    parser.add_argument("--archive", help="also save parsed puzzles to this SQLite archive")
+    args = parser.parse_args()
+    archive = SQLiteArchive(args.archive) if args.archive else None
+    try:
+        main(
+            datetime.strptime(args.start, "%Y%m%d"),
+            datetime.strptime(args.end, "%Y%m%d"),
+            workers=args.workers,
+            rate=args.rate,
+            checkpoint_path=args.checkpoint,
+            store=PuzzleStore(args.store, max_bytes=float("inf")),
+            writer=archive,
+        )
+    finally:
+        if archive is not None:
+            archive.close()
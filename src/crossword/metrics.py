@@ -0,0 +1,131 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds in seconds; upstream round trips dominate so the range is wide
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Stage timings of the request being handled, shared with any worker threads it starts
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Process-wide counters and latency histograms, rendered in Prometheus text format."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[LabelKey, float] = {}
+        self._histograms: Dict[LabelKey, Histogram] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time a pipeline stage into ``crossword_stage_seconds`` and the current request."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe("crossword_stage_seconds", elapsed, stage=stage)
+            timings = _request_timings.get()
+            if timings is not None:
+                timings.append((stage, elapsed))
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            name = None
+            for (counter_name, labels), value in sorted(self._counters.items()):
+                if counter_name != name:
+                    name = counter_name
+                    lines.extend(self._header(name, "counter"))
+                lines.append(f"{name}{_labels(labels)} {value:g}")
+            for (histogram_name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                if histogram_name != name:
+                    name = histogram_name
+                    lines.extend(self._header(name, "histogram"))
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name: str, kind: str) -> List[str]:
+        header = [f"# TYPE {name} {kind}"]
+        if name in self._help:
+            header.insert(0, f"# HELP {name} {self._help[name]}")
+        return header
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def start_request_timing() -> List[Tuple[str, float]]:
+    """Begin collecting stage timings for the current request."""
+    timings: List[Tuple[str, float]] = []
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing(timings: List[Tuple[str, float]]) -> str:
+    """Summed stage timings as a ``Server-Timing`` header value."""
+    totals: Dict[str, float] = {}
+    for stage, elapsed in timings:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
+
+
+metrics = Metrics()
+metrics.describe("crossword_stage_seconds", "Time spent in each puzzle pipeline stage.")
+metrics.describe("crossword_request_seconds", "End-to-end request latency by endpoint.")
+metrics.describe("crossword_upstream_requests_total", "Requests sent to the nytsyn upstream.")
+metrics.describe("crossword_upstream_retries_total", "Upstream requests that failed and were retried.")
+metrics.describe("crossword_store_hits_total", "Puzzle payloads served from the on-disk store.")
+metrics.describe("crossword_store_misses_total", "Puzzle payloads not found in the on-disk store.")
@@ -0,0 +1,119 @@
+import codecs
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Union
+
+# Blank-line separated sections of the upstream payload, in order
+HEADER_SECTIONS = ("header", "date", "title", "authors", "rows", "cols", "across_count", "down_count")
+GRID_SECTION = len(HEADER_SECTIONS)
+# Anything from here on is a server stack trace appended to the body
+TRAILER_MARKER = "org.apache"
+
+
+class PayloadParseError(ValueError):
+    """The upstream payload does not have the expected structure.
+
+    ``section`` names the part that was missing or malformed.
+    """
+
+    def __init__(self, message: str, section: Optional[str] = None):
+        super().__init__(message)
+        self.section = section
+
+
+class PayloadParser:
+    """Incremental parser for the nytsyn text format.
+
+    Feed it chunks of text (or UTF-8 bytes) in any sizes as they arrive, then
+    call ``close`` for the parsed fields. Sections are cut on ``"\n\n"`` exactly
+    as ``str.split`` would, each one as soon as its separator arrives, and only
+    the header, the grid and the two most recent sections are kept, since the
+    across and down clues are always the last two.
+    """
+
+    def __init__(self):
+        self._decoder = None
+        self._buffer = ""
+        self._started = False
+        self._done = False
+        self._count = 0
+        self._header: List[str] = []
+        self._grid: List[str] = []
+        self._tail = deque(maxlen=2)
+
+    def feed(self, chunk: Union[str, bytes]) -> None:
+        if self._done:
+            return
+        if isinstance(chunk, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = self._decoder.decode(chunk)
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            self._started = True
+        self._buffer += chunk
+        cut = self._buffer.find(TRAILER_MARKER)
+        if cut != -1:
+            self._buffer = self._buffer[:cut]
+            self._done = True
+        sections = self._buffer.split("\n\n")
+        self._buffer = sections.pop()
+        for section in sections:
+            self._section(section)
+
+    def close(self) -> Dict:
+        """Finish parsing and return the ``Crossword`` fields."""
+        if self._decoder is not None and not self._done:
+            self.feed(self._decoder.decode(b"", final=True))
+        if self._buffer or self._started:
+            self._section(self._buffer)
+            self._buffer = ""
+
+        if self._count < GRID_SECTION + 3 or len(self._tail) < 2:
+            missing = (HEADER_SECTIONS + ("grid", "across", "down"))[min(self._count, GRID_SECTION + 2)]
+            raise PayloadParseError(
+                f"payload ended after {self._count} sections, expected at least {GRID_SECTION + 3}",
+                section=missing,
+            )
+        header = dict(zip(HEADER_SECTIONS, self._header))
+        size = {}
+        for field in ("rows", "cols"):
+            try:
+                size[field] = int(header[field])
+            except ValueError:
+                raise PayloadParseError(f"{field} is not a number: {header[field]!r}", section=field) from None
+        across, down = self._tail
+        return {
+            "date": header["date"],
+            "title": header["title"],
+            "authors": [author.strip() for author in header["authors"].split("/")],
+            "size": size,
+            "grid": self._grid,
+            "across": _hints(across),
+            "down": _hints(down),
+        }
+
+    def _section(self, text: str) -> None:
+        if self._count < GRID_SECTION:
+            self._header.append(text.strip())
+        elif self._count == GRID_SECTION:
+            self._grid = text.split("\n")
+        elif text.strip():
+            self._tail.append(text)
+        self._count += 1
+
+
+def _hints(text: str) -> List[str]:
+    return [hint for hint in text.strip().split("\n") if hint.strip()]
+
+
+def parse_payload(source: Union[str, bytes, Iterable[Union[str, bytes]]]) -> Dict:
+    """Parse a whole payload, or an iterable of chunks such as a file or streamed response."""
+    parser = PayloadParser()
+    if isinstance(source, (str, bytes)):
+        parser.feed(source)
+    else:
+        for chunk in source:
+            parser.feed(chunk)
+    return parser.close()
@@ -0,0 +1,214 @@
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date as date_type, datetime
+from typing import Iterable, List, Optional, Tuple, Union
+
+INDEX_FILE = "index.db"
+LEGACY_INDEX_FILE = "index.json"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS store_version (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_version VALUES (0, 0);
+"""
+
+
+def normalize_date(date: Union[str, date_type, datetime]) -> str:
+    """Return the upstream ``yymmdd`` key for a date or a ``yymmdd``, ``yyyymmdd`` or ``yyyy-mm-dd`` string."""
+    if isinstance(date, (date_type, datetime)):
+        return date.strftime("%y%m%d")
+    date = date.strip()
+    if len(date) == 10 and date[4] == date[7] == "-":
+        date = date.replace("-", "")
+    if len(date) == 8 and date.isdigit():
+        return date[2:]
+    if len(date) == 6 and date.isdigit():
+        return date
+    raise ValueError(f"Unrecognised puzzle date: {date!r}")
+
+
+class PuzzleStore:
+    """Directory of gzip-compressed upstream payloads plus a SQLite index of them.
+
+    A puzzle never changes once published, so entries are only ever evicted
+    to respect ``max_bytes``; the least recently read payloads go first. The
+    index keeps one row per payload in WAL mode, so several worker processes
+    can share a directory without losing each other's entries.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each worker opens its own
+        if self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, INDEX_FILE)
+            is_new = not os.path.exists(path)
+            self._connection = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+            if is_new:
+                self._import_legacy_index()
+            self._pid = os.getpid()
+        return self._connection
+
+    def __contains__(self, date) -> bool:
+        key = normalize_date(date)
+        with self._lock:
+            return self.connection.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.dates())
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever any process adds, evicts or forgets a payload."""
+        with self._lock:
+            return self.connection.execute("SELECT version FROM store_version").fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def dates(self) -> List[str]:
+        """All stored dates as ``yymmdd`` keys, oldest puzzle first."""
+        with self._lock:
+            return [key for key, in self.connection.execute("SELECT key FROM entries ORDER BY key")]
+
+    def get(self, date) -> Optional[str]:
+        """Return the raw payload for ``date``, or None if it is not stored."""
+        key = normalize_date(date)
+        with self._lock:
+            connection = self.connection
+            if connection.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is None:
+                return None
+            try:
+                with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                    payload = f.read()
+            except OSError:
+                # Payload vanished or is corrupt; forget it so it is refetched.
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                connection.execute("UPDATE store_version SET version = version + 1")
+                connection.execute("COMMIT")
+                return None
+            connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            return payload
+
+    def put(self, date, payload: str) -> None:
+        """Store ``payload`` for ``date`` and evict old entries if over budget."""
+        key = normalize_date(date)
+        data = gzip.compress(payload.encode("utf-8"))
+        with self._lock:
+            connection = self.connection
+            # Unique per process, so concurrent writers of one date never share a file
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, len(data), time.time()))
+                evicted = self._evict()
+                connection.execute("UPDATE store_version SET version = version + 1")
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        for key in evicted:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def seed(self, payloads: Iterable[Tuple[str, str]]) -> int:
+        """Pre-seed the store from ``(date, payload)`` pairs; returns the count added."""
+        added = 0
+        for date, payload in payloads:
+            if date not in self:
+                self.put(date, payload)
+                added += 1
+        return added
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = self._pid = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt.gz")
+
+    def _evict(self) -> List[str]:
+        """Drop the least recently read entries while over ``max_bytes``; returns their keys."""
+        total = self.connection.execute("SELECT SUM(size) FROM entries").fetchone()[0]
+        evicted = []
+        if total <= self.max_bytes:
+            return evicted
+        for key, size in self.connection.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            total -= size
+            evicted.append(key)
+        self.connection.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+        return evicted
+
+    def _import_legacy_index(self) -> None:
+        """Index the payloads already in the directory, e.g. from before the SQLite index.
+
+        Access times come from an old ``index.json`` where it has them, else
+        from the file; payloads it lost track of are picked up too.
+        """
+        try:
+            with open(os.path.join(self.directory, LEGACY_INDEX_FILE)) as f:
+                accessed = {key: item["accessed"] for key, item in json.load(f).items()}
+        except (OSError, ValueError, KeyError, AttributeError):
+            accessed = {}
+        rows = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".txt.gz"):
+                key = name[:-len(".txt.gz")]
+                stat = os.stat(os.path.join(self.directory, name))
+                rows.append((key, stat.st_size, accessed.get(key, stat.st_mtime)))
+        self._connection.execute("BEGIN IMMEDIATE")
+        self._connection.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?)", rows)
+        self._connection.execute("COMMIT")
+
+
+if __name__ == "__main__":
+    # Pre-seed a store from upstream: python -m crossword.puzzle_store DIR 20180101 20180131
+    import sys
+
+    from .data_reader import DataReader
+
+    store = PuzzleStore(sys.argv[1])
+    start = datetime.strptime(sys.argv[2], "%Y%m%d")
+    end = datetime.strptime(sys.argv[3], "%Y%m%d")
+    for _ in DataReader(store=store).fetch_data(start, end):
+        pass
+    print(f"Store now holds {len(store)} puzzles ({store.total_bytes} bytes)")
@@ -0,0 +1,118 @@
+"""
+Rebuild the SQLite archive from the raw payloads in a puzzle store, using every core.
+
+    cd src && python -m crossword.rebuild ~/.cache/crossword/puzzles crossword_data.db --workers 16
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .archive import PuzzleRows, SQLiteArchive, puzzle_rows
+from .crossword_builder import layout_entries, process_rebus_grid
+from .entity import Crossword
+from .grid_analysis import layout_cache
+from .puzzle_store import PuzzleStore
+
+# Store opened once in each worker process by ``_init_worker``
+_store: Optional[PuzzleStore] = None
+
+
+class RebuildReport(NamedTuple):
+    total: int
+    rebuilt: int
+    failures: Dict[str, str]
+    seconds: float
+
+
+def _init_worker(directory: str) -> None:
+    global _store
+    _store = PuzzleStore(directory, max_bytes=float("inf"))
+
+
+def _rebuild_chunk(dates: List[str]) -> List[Tuple[str, Optional[PuzzleRows], Optional[str]]]:
+    """Read, parse and build some puzzles in a worker; failures are returned, not raised.
+
+    Their grids are analyzed in one ``LayoutCache.layouts`` call, which numbers
+    grids of the same size together when NumPy is installed.
+    """
+    results = []
+    parsed = []
+    for date in dates:
+        try:
+            payload = _store.get(date)
+            if payload is None:
+                raise LookupError("payload missing from store")
+            crossword = Crossword.from_api_response(payload)
+            parsed.append((date, crossword, *process_rebus_grid(crossword.grid)))
+        except Exception as e:
+            results.append((date, None, repr(e)))
+    layouts = layout_cache.layouts([grid for _, _, grid, _ in parsed])
+    for (date, crossword, grid, rebus_map), layout in zip(parsed, layouts):
+        try:
+            entries = layout_entries(grid, rebus_map, [clue.hint for clue in crossword.across],
+                                     [clue.hint for clue in crossword.down], layout)
+            results.append((date, puzzle_rows(crossword, entries), None))
+        except Exception as e:
+            results.append((date, None, repr(e)))
+    return results
+
+
+def rebuild(store_directory: str, archive: SQLiteArchive, dates: Optional[List[str]] = None,
+            workers: Optional[int] = None, chunksize: int = 64, batch_size: int = 500,
+            report_every: int = 1000) -> RebuildReport:
+    """Rebuild ``dates`` (default: all stored) into ``archive`` across ``workers`` processes.
+
+    Workers read payloads from the store themselves, so only the finished rows
+    cross process boundaries; dates go out ``chunksize`` at a time and rows are
+    written back ``batch_size`` puzzles per transaction, with the search index
+    rebuilt once at the end. The writes are the only serial step.
+
+    The archive's search index is suspended for the whole run (see
+    ``SQLiteArchive.bulk_load``), so a server searching the same file misses
+    or mismatches rebuilt puzzles until it finishes.
+    """
+    if dates is None:
+        dates = PuzzleStore(store_directory).dates()
+    started = time.monotonic()
+    failures: Dict[str, str] = {}
+    batch: List[PuzzleRows] = []
+    rebuilt = 0
+    with archive.bulk_load(), ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                  initargs=(store_directory,)) as pool:
+        chunks = [dates[i:i + chunksize] for i in range(0, len(dates), chunksize)]
+        results = (result for chunk in pool.map(_rebuild_chunk, chunks) for result in chunk)
+        for done, (date, rows, error) in enumerate(results, 1):
+            if error is not None:
+                failures[date] = error
+                print(f"Failed to rebuild {date}: {error}")
+            else:
+                batch.append(rows)
+                rebuilt += 1
+            if len(batch) >= batch_size:
+                archive.write_rows(batch)
+                batch = []
+            if done % report_every == 0:
+                print(f"{done}/{len(dates)} puzzles, {done / (time.monotonic() - started):.0f}/s")
+        archive.write_rows(batch)
+    return RebuildReport(len(dates), rebuilt, failures, time.monotonic() - started)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the SQLite archive from stored payloads.")
+    parser.add_argument("store", help="PuzzleStore directory to read")
+    parser.add_argument("archive", help="SQLite archive to write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=64, help="dates handed to a worker at a time")
+    args = parser.parse_args(argv)
+
+    with SQLiteArchive(args.archive) as archive:
+        report = rebuild(args.store, archive, workers=args.workers, chunksize=args.chunksize)
+    print(f"Rebuilt {report.rebuilt}/{report.total} puzzles in {report.seconds:.1f}s "
+          f"({len(report.failures)} failed)")
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,160 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Iterator, TypeVar
+
+from .metrics import metrics
+
+T = TypeVar("T")
+
+
+class UpstreamError(Exception):
+    """Upstream could not be reached for ``date`` after every retry."""
+
+    def __init__(self, date: str, message: str = "upstream retries exhausted"):
+        super().__init__(f"{message} for {date}")
+        self.date = date
+
+
+class UpstreamNotFoundError(LookupError):
+    """Upstream answered with a client error (usually 404): it has no puzzle for ``date``."""
+
+    def __init__(self, date: str, status: int):
+        super().__init__(f"upstream has no puzzle for {date} (HTTP {status})")
+        self.date = date
+        self.status = status
+
+
+def is_client_error(status) -> bool:
+    """A 4xx answer that retrying will not change; 429 means slow down, so it is retried."""
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+class CircuitOpenError(UpstreamError):
+    """Upstream is known to be failing, so the fetch was not attempted."""
+
+    def __init__(self, date: str, retry_after: float):
+        super().__init__(date, "upstream circuit open")
+        self.retry_after = retry_after
+
+
+class UpstreamBusyError(UpstreamError):
+    """A prefetch of ``date`` was shed to leave upstream capacity for interactive requests."""
+
+    def __init__(self, date: str, retry_after: float):
+        super().__init__(date, "upstream busy with interactive requests")
+        self.retry_after = retry_after
+
+
+def backoff_delays(base: float, retries: int, cap: float = 16.0, rng=random) -> Iterator[float]:
+    """"Full jitter" backoff: a random wait below ``base * 2**attempt``, capped at ``cap``.
+
+    Each call gets its own sequence, so one slow fetch never lengthens another's
+    waits, and the randomness keeps concurrent retries from arriving in lockstep.
+    """
+    for attempt in range(retries):
+        yield rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Stops calling upstream after ``failure_threshold`` consecutive failures.
+
+    While open every call fails immediately; after ``reset_timeout`` seconds one
+    probe is let through (half-open) and its outcome closes or re-opens the circuit.
+    A probe that reports neither within another ``reset_timeout`` (cancelled, or
+    failed some other way) is given up on and the next call probes instead.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != self.CLOSED and self.retry_after() > 0
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe may be sent."""
+        return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.retry_after() == 0:
+                # Open long enough, or the last probe never reported back
+                self.state = self.HALF_OPEN
+                self._opened_at = self.clock()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    metrics.inc("crossword_circuit_opened_total")
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution."""
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            metrics.inc("crossword_coalesced_fetches_total")
+            return future.result()
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+class AsyncSingleFlight:
+    """``SingleFlight`` for coroutines sharing one event loop."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            metrics.inc("crossword_coalesced_fetches_total")
+        # shield: one caller going away must not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+
+metrics.describe("crossword_circuit_opened_total", "Times the upstream circuit breaker opened.")
+metrics.describe("crossword_circuit_rejected_total", "Fetches refused because the upstream circuit was open.")
+metrics.describe("crossword_coalesced_fetches_total", "Fetches that joined one already in flight for the same date.")
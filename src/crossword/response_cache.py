@@ -0,0 +1,62 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from .metrics import metrics
+
+
+class CachedResponse(NamedTuple):
+    """A ready-to-send puzzle body and its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class ResponseCache:
+    """Bounded LRU of serialized puzzle responses keyed by ``yymmdd`` date.
+
+    A built puzzle depends only on its date, so repeat requests skip parsing,
+    building and serializing altogether.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, date: str) -> bool:
+        return date in self._entries
+
+    def get(self, date: str) -> Optional[CachedResponse]:
+        with self._lock:
+            cached = self._entries.get(date)
+            if cached is not None:
+                self._entries.move_to_end(date)
+        metrics.inc("crossword_response_cache_hits_total" if cached else "crossword_response_cache_misses_total")
+        return cached
+
+    def put(self, date: str, body: bytes) -> CachedResponse:
+        cached = CachedResponse(body, make_etag(body))
+        with self._lock:
+            self._entries[date] = cached
+            self._entries.move_to_end(date)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def get_or_build(self, date: str, build: Callable[[], bytes]) -> CachedResponse:
+        cached = self.get(date)
+        if cached is None:
+            cached = self.put(date, build())
+        return cached
+
+
+metrics.describe("crossword_response_cache_hits_total", "Puzzle responses served from the in-memory cache.")
+metrics.describe("crossword_response_cache_misses_total", "Puzzle responses that had to be built.")
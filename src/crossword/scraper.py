@@ -1,6 +1,7 @@
 
-from data_reader import DataReader
-from entity import Crossword
+from .archive import SQLiteArchive
+from .data_reader import DataReader
+from .entity import Crossword
 
 from datetime import datetime
 
@@ -12,8 +13,8 @@ def main(start_date, end_date):
     reader = DataReader(
         base_url="https://nytsyn.pzzl.com/nytsyn-crossword-mh/nytsyncrossword"
     )
-    writer = CSVWriter("crossword_data.csv")
-    usecase(reader, writer, start_date, end_date)
+    with SQLiteArchive("crossword_data.db") as writer:
+        usecase(reader, writer, start_date, end_date)
 
 
 def usecase(reader, writer, start_date, end_date):
@@ -27,6 +28,8 @@ def usecase(reader, writer, start_date, end_date):
 import csv
 
 class CSVWriter:
+    """Flat CSV export; ``SQLiteArchive`` is the queryable archive."""
+
     def __init__(self, filename):
         self.filename = filename
         # Open the file and write the header
@@ -0,0 +1,85 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+from .crossword_builder import CellIndex, layout_entries
+from .entity import Crossword, Entry
+
+COMPACT_MIMETYPE = "application/vnd.crossword.compact+json"
+
+# C-accelerated string escaper used by json.dumps itself
+_quote = json.encoder.encode_basestring_ascii
+
+
+def dumps_entries(entries: List[Entry]) -> str:
+    """JSON array of entries with the same keys as ``CrosswordEntry.dict()``."""
+    return "[" + ",".join(
+        f'{{"clue":{_quote(entry.clue)},"answer":{_quote(entry.answer)},"index":{entry.index},'
+        f'"x":{entry.x},"y":{entry.y},"direction":"{entry.direction}"}}'
+        for entry in entries
+    ) + "]"
+
+
+def dumps_puzzle(crossword: Crossword, entries: List[Entry], cells: Optional[CellIndex] = None) -> bytes:
+    """Serialize the ``{"metadata": ..., "entries": [...]}`` response body straight to bytes.
+
+    ``cells``, the ``crossing_index`` of the grid, is added as ``"cells"`` when given.
+    """
+    metadata = json.dumps(
+        {"date": crossword.date, "title": crossword.title, "authors": crossword.authors},
+        separators=(",", ":"),
+    )
+    body = f'{{"metadata":{metadata},"entries":{dumps_entries(entries)}'
+    if cells is not None:
+        body += ',"cells":' + json.dumps(cells, separators=(",", ":"))
+    return (body + "}").encode("ascii")
+
+
+def dumps_compact(crossword: Crossword, grid: List[str], rebus_map: Dict[Tuple[int, int], str]) -> bytes:
+    """Compact response body: the ``process_rebus_grid`` grid, its rebus cells and the clue texts.
+
+    Entries are not sent; ``expand_compact`` (and ``expandPuzzle`` in main.js)
+    rebuild exactly what ``build_entries`` would, so each letter travels once
+    and no key is repeated per entry.
+    """
+    return json.dumps(
+        {
+            "metadata": {"date": crossword.date, "title": crossword.title, "authors": crossword.authors},
+            "format": "compact",
+            "grid": grid,
+            "rebus": [[x, y, letters] for (x, y), letters in sorted(rebus_map.items())],
+            "across": [clue.hint for clue in crossword.across],
+            "down": [clue.hint for clue in crossword.down],
+        },
+        separators=(",", ":"),
+    ).encode("ascii")
+
+
+def expand_compact(puzzle: Dict) -> List[Entry]:
+    """Entries of a decoded ``dumps_compact`` body."""
+    rebus_map = {(x, y): letters for x, y, letters in puzzle["rebus"]}
+    return layout_entries(puzzle["grid"], rebus_map, puzzle["across"], puzzle["down"])
+
+
+def accepts_compact(format_arg: Optional[str], accept: str) -> bool:
+    """Whether a request asked for the compact body, via ``?format=compact`` or its ``Accept`` header."""
+    if format_arg is not None:
+        return format_arg == "compact"
+    for media_range in accept.split(","):
+        media_type, *params = media_range.split(";")
+        if media_type.strip() == COMPACT_MIMETYPE:
+            quality = [param.strip()[2:] for param in params if param.strip().startswith("q=")]
+            try:
+                return not quality or float(quality[0]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def puzzle_mimetype(compact: bool) -> str:
+    """Content type of a puzzle body, or of a list of them."""
+    return COMPACT_MIMETYPE if compact else "application/json"
+
+
+def dumps_puzzle_list(puzzles: List[bytes]) -> bytes:
+    """Wrap already serialized puzzles as ``{"puzzles": [...]}``."""
+    return b'{"puzzles":[' + b",".join(puzzles) + b"]}"
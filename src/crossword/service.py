@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime
+from typing import List, Optional, Union
+
+from .async_reader import AsyncDataReader
+from .crossword_builder import build_entries_with_cells, process_rebus_grid
+from .data_reader import DataReader
+from .entity import Crossword
+from .metrics import metrics
+from .resilience import UpstreamBusyError
+from .response_cache import CachedResponse, ResponseCache
+from .serialization import dumps_compact, dumps_puzzle
+from .shared_cache import SharedCache
+
+
+def cache_key(date: str, compact: bool = False) -> str:
+    """Response cache key: the two wire formats of a puzzle are cached separately."""
+    return f"{date}.compact" if compact else date
+
+
+def build_response(data, weekday: Optional[int] = None, compact: bool = False) -> bytes:
+    """Parse an upstream payload and serialize the built puzzle, optionally checking its weekday.
+
+    ``compact`` selects the ``dumps_compact`` body, which needs no entry building;
+    the full body carries the grid's cell crossing index as well.
+    """
+    with metrics.stage("parse"):
+        crossword = Crossword.from_api_response(data)
+    if weekday is not None:
+        # Validate that the crosswords date is the correct weekday
+        assert datetime.strptime(crossword.date, "%y%m%d").weekday() == weekday
+    if compact:
+        with metrics.stage("serialize"):
+            return dumps_compact(crossword, *process_rebus_grid(crossword.grid))
+    with metrics.stage("build"):
+        entries, cells = build_entries_with_cells(crossword)
+    with metrics.stage("serialize"):
+        return dumps_puzzle(crossword, entries, cells)
+
+
+def _collect(dates: List[str], results: List[Union[CachedResponse, BaseException]]) -> List[bytes]:
+    """Bodies of the puzzles that were built, logging the rest; see ``PuzzleService.build_puzzles``."""
+    puzzles, errors = [], []
+    for date, result in zip(dates, results):
+        if isinstance(result, BaseException):
+            print(f"Skipping crossword for {date}: {result!r}")
+            errors.append(result)
+        else:
+            puzzles.append(result.body)
+    if errors and not puzzles and all(isinstance(error, UpstreamBusyError) for error in errors):
+        raise errors[0]
+    return puzzles
+
+
+class PuzzleService:
+    """Fetch, parse and build puzzles into the JSON shape the client expects.
+
+    Responses are cached in ``cache`` and, when given, in a ``SharedCache``
+    behind it that other worker processes on the host read and fill too.
+    """
+
+    def __init__(self, reader: DataReader, cache: Optional[ResponseCache] = None, max_workers: int = 8,
+                 shared: Optional[SharedCache] = None):
+        self.reader = reader
+        self.cache = cache if cache is not None else ResponseCache()
+        self.max_workers = max_workers
+        self.shared = shared
+
+    def get_crossword(self, date: str) -> Crossword:
+        """Fetch and parse the puzzle published on ``date`` (``yymmdd``)."""
+        with metrics.stage("fetch"):
+            data = self.reader._fetch_data(date)
+        with metrics.stage("parse"):
+            return Crossword.from_api_response(data)
+
+    def build_puzzle(self, date: str, weekday: Optional[int] = None, compact: bool = False) -> bytes:
+        """Build the JSON response body for ``date``, optionally checking its weekday."""
+        with metrics.stage("fetch"):
+            data = self.reader._fetch_data(date)
+        return build_response(data, weekday, compact)
+
+    def get_puzzle(self, date: str, weekday: Optional[int] = None, compact: bool = False) -> CachedResponse:
+        """Serialized puzzle for ``date`` from the response cache, building it on a miss."""
+        key = cache_key(date, compact)
+
+        def build() -> bytes:
+            if self.shared is None:
+                return self.build_puzzle(date, weekday, compact)
+            return self.shared.get_or_build(key, lambda: self.build_puzzle(date, weekday, compact))
+
+        return self.cache.get_or_build(key, build)
+
+    def build_puzzles(self, dates: List[str], weekday: Optional[int] = None, compact: bool = False) -> List[bytes]:
+        """Get several puzzles, overlapping the upstream fetches of those not cached.
+
+        Dates that fail to fetch or parse are dropped rather than failing the batch,
+        unless every one was shed by the upstream scheduler: then the first
+        ``UpstreamBusyError`` is raised so the caller can ask for a retry.
+        """
+        if not dates:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(dates))) as pool:
+            # Run in copies of the request context so stage timings reach the request
+            futures = [pool.submit(copy_context().run, self.get_puzzle, date, weekday, compact) for date in dates]
+        return _collect(dates, [future.exception() or future.result() for future in futures])
+
+
+class AsyncPuzzleService:
+    """``PuzzleService`` for the ASGI app, fetching through an ``AsyncDataReader``."""
+
+    def __init__(self, reader: AsyncDataReader, cache: Optional[ResponseCache] = None,
+                 shared: Optional[SharedCache] = None):
+        self.reader = reader
+        self.cache = cache if cache is not None else ResponseCache()
+        self.shared = shared
+
+    async def get_puzzle(self, date: str, weekday: Optional[int] = None, compact: bool = False) -> CachedResponse:
+        key = cache_key(date, compact)
+        cached = self.cache.get(key)
+        if cached is None:
+            async def build() -> bytes:
+                with metrics.stage("fetch"):
+                    data = await self.reader.fetch_data(date)
+                # Parsing and serializing are CPU work that would stall every other request
+                return await asyncio.to_thread(build_response, data, weekday, compact)
+
+            body = await (build() if self.shared is None else self.shared.get_or_build_async(key, build))
+            cached = self.cache.put(key, body)
+        return cached
+
+    async def build_puzzles(self, dates: List[str], weekday: Optional[int] = None,
+                            compact: bool = False) -> List[bytes]:
+        """Get several puzzles with all their upstream fetches in flight at once."""
+        results = await asyncio.gather(
+            *(self.get_puzzle(date, weekday, compact) for date in dates), return_exceptions=True
+        )
+        return _collect(dates, results)
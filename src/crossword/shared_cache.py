@@ -0,0 +1,230 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Optional, Tuple
+
+from .metrics import metrics
+from .payload_parser import PayloadParseError
+from .resilience import UpstreamNotFoundError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    stored REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_stored ON responses (stored);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS build_failures (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    stored REAL NOT NULL
+);
+"""
+
+
+class SharedCache:
+    """Puzzle responses shared by every worker process on a host, in a WAL-mode SQLite file.
+
+    It sits behind each worker's in-memory ``ResponseCache``. A miss takes a
+    lease on the key before building, so of several workers missing the same
+    date only one fetches and builds it; the others poll until the body
+    appears. A lease held longer than ``lease_seconds`` (a worker that died
+    mid-build) is taken over, and a waiter that gives up builds the body itself.
+    A build that fails for good (upstream has no such puzzle, or sent one that
+    does not parse) is recorded, and the workers waiting on it raise the same
+    error rather than each fetching the date again. Other failures, such as a
+    shed prefetch or an open circuit, only release the lease, so a waiter
+    builds the body itself at its own priority.
+    """
+
+    def __init__(self, path: str, max_entries: int = 4096, lease_seconds: float = 30,
+                 poll_interval: float = 0.05):
+        self.path = path
+        self.max_entries = max_entries
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._owner: Optional[str] = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Connections and lease owners must not cross a fork, so each worker has its own
+        if self._pid != os.getpid():
+            self._owner = uuid.uuid4().hex
+            self._connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False,
+                                               isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = self._pid = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self.connection.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def put(self, key: str, body: bytes) -> None:
+        """Store ``body``, dropping the oldest responses beyond ``max_entries``."""
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, body, time.time()))
+                excess = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    connection.execute(
+                        "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY stored LIMIT ?)",
+                        (excess,),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def fail(self, key: str, error: BaseException) -> None:
+        """Record that building ``key`` raised ``error``, if it is one worth sharing with waiters."""
+        encoded = _encode_error(error)
+        if encoded is None:
+            return
+        now = time.time()
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Only waiters read a failure, and none waits longer than a lease
+                connection.execute("DELETE FROM build_failures WHERE stored < ?", (now - self.lease_seconds,))
+                connection.execute("INSERT OR REPLACE INTO build_failures VALUES (?, ?, ?, ?)", (key, *encoded, now))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def failure(self, key: str, since: float) -> Optional[BaseException]:
+        """The error recorded by a build of ``key`` that failed after ``since`` (a ``time.time()``)."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT kind, fields FROM build_failures WHERE key = ? AND stored >= ?", (key, since)
+            ).fetchone()
+        return None if row is None else _decode_error(*row)
+
+    def acquire(self, key: str) -> bool:
+        """Take the build lease on ``key``; False while another live worker holds it."""
+        now = time.time()
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM leases WHERE key = ? AND expires < ?", (key, now))
+                taken = connection.execute(
+                    "INSERT OR IGNORE INTO leases VALUES (?, ?, ?)", (key, self._owner, now + self.lease_seconds)
+                ).rowcount == 1
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return taken
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self._owner))
+
+    def get_or_build(self, key: str, build: Callable[[], bytes]) -> bytes:
+        """The stored body for ``key``, building and storing it if no other worker is already doing so."""
+        started = time.time()
+        deadline = time.monotonic() + self.lease_seconds
+        while True:
+            body = self.get(key)
+            if body is not None:
+                metrics.inc("crossword_shared_cache_hits_total")
+                return body
+            error = self.failure(key, started)
+            if error is not None:
+                raise error
+            if self.acquire(key):
+                break
+            if time.monotonic() > deadline:
+                return build()
+            time.sleep(self.poll_interval)
+        metrics.inc("crossword_shared_cache_misses_total")
+        try:
+            body = build()
+        except Exception as e:
+            self.fail(key, e)
+            raise
+        else:
+            self.put(key, body)
+            return body
+        finally:
+            self.release(key)
+
+    async def get_or_build_async(self, key: str, build: Callable[[], Awaitable[bytes]]) -> bytes:
+        """``get_or_build`` for the event loop; the SQLite calls run in the default executor."""
+        started = time.time()
+        deadline = time.monotonic() + self.lease_seconds
+        while True:
+            body = await asyncio.to_thread(self.get, key)
+            if body is not None:
+                metrics.inc("crossword_shared_cache_hits_total")
+                return body
+            error = await asyncio.to_thread(self.failure, key, started)
+            if error is not None:
+                raise error
+            if await asyncio.to_thread(self.acquire, key):
+                break
+            if time.monotonic() > deadline:
+                return await build()
+            await asyncio.sleep(self.poll_interval)
+        metrics.inc("crossword_shared_cache_misses_total")
+        try:
+            body = await build()
+        except Exception as e:
+            await asyncio.to_thread(self.fail, key, e)
+            raise
+        else:
+            await asyncio.to_thread(self.put, key, body)
+            return body
+        finally:
+            await asyncio.to_thread(self.release, key)
+
+
+def _encode_error(error: BaseException) -> Optional[Tuple[str, str]]:
+    """``(kind, fields)`` for a definitive build failure; None for one a retry may fix."""
+    if isinstance(error, UpstreamNotFoundError):
+        return "not_found", json.dumps({"date": error.date, "status": error.status})
+    if isinstance(error, PayloadParseError):
+        return "parse", json.dumps({"message": str(error), "section": error.section})
+    return None
+
+
+def _decode_error(kind: str, fields: str) -> BaseException:
+    fields = json.loads(fields)
+    if kind == "not_found":
+        return UpstreamNotFoundError(fields["date"], fields["status"])
+    return PayloadParseError(fields["message"], fields["section"])
+
+
+metrics.describe("crossword_shared_cache_hits_total", "Puzzle responses found in the cache shared by worker processes.")
+metrics.describe("crossword_shared_cache_misses_total", "Puzzle responses this worker built for the shared cache.")
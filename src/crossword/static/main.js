@@ -1,3 +1,114 @@
+// Compact puzzles (?format=compact) carry the grid, rebus cells and clue texts instead
+// of entries. These mirror analyze_grid and layout_entries on the server, so the
+// rebuilt entries are identical to the ones the full format would have sent.
+function analyzeGrid(rows) {
+    const height = rows.length;
+    const width = height ? rows[0].length : 0;
+    const across = [];
+    const down = [];
+    let number = 0;
+    for (let y = 0; y < height; y++) {
+        const row = rows[y];
+        const above = y ? rows[y - 1] : '';
+        const limit = Math.min(width, row.length);
+        for (let x = 0; x < limit; x++) {
+            if (row[x] === '#') continue;
+            const startsAcross = x === 0 || row[x - 1] === '#';
+            const startsDown = y === 0 || (x < above.length && above[x] === '#');
+            if (!startsAcross && !startsDown) continue;
+            number++;
+            if (startsAcross) {
+                let end = x + 1;
+                while (end < limit && row[end] !== '#') end++;
+                across.push({ number, x, y, length: end - x });
+            }
+            if (startsDown) {
+                let end = y + 1;
+                while (end < height && x < rows[end].length && rows[end][x] !== '#') end++;
+                down.push({ number, x, y, length: end - y });
+            }
+        }
+    }
+    return { across, down };
+}
+
+// Mirrors crossing_index: per cell [across entry, position, down entry, position],
+// -1 where the cell is in no word that way, null for black squares. Entry ids are
+// positions in the entries list, across entries first.
+function crossingIndex(across, down) {
+    let width = 0;
+    let height = 0;
+    across.forEach(span => { width = Math.max(width, span.x + span.length); height = Math.max(height, span.y + 1); });
+    down.forEach(span => { width = Math.max(width, span.x + 1); height = Math.max(height, span.y + span.length); });
+    const cells = Array.from({ length: height }, () => Array(width).fill(null));
+    across.forEach((span, id) => {
+        for (let i = 0; i < span.length; i++) cells[span.y][span.x + i] = [id, i, -1, -1];
+    });
+    down.forEach((span, i) => {
+        const id = across.length + i;
+        for (let j = 0; j < span.length; j++) {
+            const cell = cells[span.y + j][span.x] || (cells[span.y + j][span.x] = [-1, -1, -1, -1]);
+            cell[2] = id;
+            cell[3] = j;
+        }
+    });
+    return cells;
+}
+
+function expandPuzzle(puzzle) {
+    if (puzzle.format !== 'compact') {
+        // Full-format puzzles carry their cell index; ones cached before it get it from the entries
+        if (puzzle.cells) return puzzle;
+        const span = word => ({ x: word.x, y: word.y, length: word.answer.length });
+        const cells = crossingIndex(
+            puzzle.entries.filter(word => word.direction === 'across').map(span),
+            puzzle.entries.filter(word => word.direction === 'down').map(span),
+        );
+        return { ...puzzle, cells };
+    }
+    const rebus = {};
+    puzzle.rebus.forEach(([x, y, letters]) => { rebus[`${x},${y}`] = letters; });
+    const cell = (x, y) => {
+        const char = puzzle.grid[y][x];
+        return char === '+' ? (rebus[`${x},${y}`] ?? '+') : char;
+    };
+    const layout = analyzeGrid(puzzle.grid);
+    const across = layout.across.slice(0, puzzle.across.length);
+    const down = layout.down.slice(0, puzzle.down.length);
+    const entries = [];
+    across.forEach((span, i) => {
+        let answer = '';
+        for (let x = span.x; x < span.x + span.length; x++) answer += cell(x, span.y);
+        entries.push({ clue: puzzle.across[i], answer, index: span.number, x: span.x, y: span.y, direction: 'across' });
+    });
+    down.forEach((span, i) => {
+        let answer = '';
+        for (let y = span.y; y < span.y + span.length; y++) answer += cell(span.x, y);
+        entries.push({ clue: puzzle.down[i], answer, index: span.number, x: span.x, y: span.y, direction: 'down' });
+    });
+    return { metadata: puzzle.metadata, entries, cells: crossingIndex(across, down) };
+}
+
+// Mirrors encode_held: bit k (least significant first) marks the k-th such weekday
+// since 2010-01-01, sent base64url-encoded as ?have= so the server samples elsewhere
+const WEEKDAY_NUMBERS = { monday: 0, tuesday: 1, wednesday: 2, thursday: 3, friday: 4, saturday: 5, sunday: 6 };
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function heldBitmap(day, keys) {
+    // 2010-01-01 was a Friday
+    const first = Date.UTC(2010, 0, 1) + ((WEEKDAY_NUMBERS[day] - 4 + 7) % 7) * DAY_MS;
+    const bytes = [];
+    keys.forEach(key => {
+        const time = Date.UTC(2000 + Number(key.slice(0, 2)), Number(key.slice(2, 4)) - 1, Number(key.slice(4, 6)));
+        const offset = Math.round((time - first) / DAY_MS);
+        if (!(offset >= 0) || offset % 7) return;
+        const k = offset / 7;
+        while (bytes.length <= k >> 3) bytes.push(0);
+        bytes[k >> 3] |= 1 << (k & 7);
+    });
+    return btoa(String.fromCharCode(...bytes)).replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '');
+}
+
 // Vue app configuration
 const CrosswordApp = {
     delimiters: ['[[', ']]'],
@@ -11,6 +122,7 @@ const CrosswordApp = {
 
         return {
             crossword: [],
+            cells: [],  // crossingIndex of the current puzzle
             grid: [],
             direction: 'across',
             isChecking: false,
@@ -139,6 +251,13 @@ const CrosswordApp = {
                 this.updateSolvedCounts(); // This might need adjustment if it just counts length
             }
         },
+        haveBitmap(day) {
+            // Everything solved or already cached for this day, so the server does not send it again
+            const solved = JSON.parse(localStorage.getItem(`solved_${day}`) || '[]').map(entry => entry?.id);
+            const cached = JSON.parse(localStorage.getItem(`crosswords_${day}`) || '[]')
+                .map(puzzle => this.getPuzzleId(puzzle.metadata));
+            return heldBitmap(day, [...solved, ...cached].filter(id => typeof id === 'string' && id.length === 6));
+        },
         getPuzzleId(puzzleMetadata) {
             // Use the unique date from metadata as the puzzle ID
             if (!puzzleMetadata || !puzzleMetadata.date) return null;
@@ -154,10 +273,13 @@ const CrosswordApp = {
             }
 
             try {
-                const response = await axios.get(`${this.baseUrl}/random_crossword/${day}`);
-                // Assuming response.data is now { metadata: {...}, entries: [...] }
-                this.currentPuzzleMetadata = response.data.metadata;
-                this.crossword = response.data.entries; 
+                const response = await axios.get(`${this.baseUrl}/random_crossword/${day}`, {
+                    params: { format: 'compact', have: this.haveBitmap(day) }
+                });
+                const puzzle = expandPuzzle(response.data);
+                this.currentPuzzleMetadata = puzzle.metadata;
+                this.crossword = puzzle.entries;
+                this.cells = puzzle.cells;
                 
                 // Use the new metadata for puzzle ID generation
                 const puzzleId = this.getPuzzleId(this.currentPuzzleMetadata);
@@ -168,8 +290,8 @@ const CrosswordApp = {
                     return;
                 }
                 
-                // Cache the whole puzzle object (metadata + entries)
-                this.cacheCrossword(day, response.data); 
+                // Cache the compact form; it is expanded again when loaded
+                this.cacheCrossword(day, response.data);
                 
                 this.init();
             } catch (error) {
@@ -181,7 +303,7 @@ const CrosswordApp = {
         cacheCrossword(day, puzzleData) {
             const storageKey = `crosswords_${day}`;
             let puzzles = JSON.parse(localStorage.getItem(storageKey) || '[]');
-            const puzzleId = this.getPuzzleId(puzzleData);
+            const puzzleId = this.getPuzzleId(puzzleData.metadata);
             
             // Don't cache if we've already solved it
             if (puzzleId && this.isPuzzleSolved(day, puzzleId)) {
@@ -189,7 +311,7 @@ const CrosswordApp = {
             }
             
             // Check if we already have this puzzle cached
-            const isDuplicate = puzzles.some(p => this.getPuzzleId(p) === puzzleId);
+            const isDuplicate = puzzles.some(p => this.getPuzzleId(p.metadata) === puzzleId);
             
             if (!isDuplicate) {
                 // Add new puzzle and keep only the latest 50
@@ -228,7 +350,7 @@ const CrosswordApp = {
             
             // Get a random puzzle index
             const randomIndex = Math.floor(Math.random() * puzzles.length);
-            const selectedPuzzle = puzzles[randomIndex]; // This is the full {metadata, entries} object
+            const selectedPuzzle = expandPuzzle(puzzles[randomIndex]); // {metadata, entries}
             
             // Use metadata for puzzle ID
             const puzzleId = this.getPuzzleId(selectedPuzzle.metadata); 
@@ -249,6 +371,7 @@ const CrosswordApp = {
             // --- If puzzle is NOT solved, proceed as before ---
             this.currentPuzzleMetadata = selectedPuzzle.metadata; // Set metadata for the loaded puzzle
             this.crossword = selectedPuzzle.entries; // Set entries
+            this.cells = selectedPuzzle.cells;
             
             // Remove the used puzzle from cache
             puzzles.splice(randomIndex, 1);
@@ -384,11 +507,10 @@ const CrosswordApp = {
             return 'friday';
         },
         find_index(rowIndex, cellIndex) {
-            for (const word of this.crossword) {
-                if (word.y === rowIndex && cellIndex === word.x) {
-                    return word.index;
-                }
-            }
+            const cell = this.cells[rowIndex]?.[cellIndex];
+            if (!cell) return null;
+            if (cell[1] === 0) return this.crossword[cell[0]].index;
+            if (cell[3] === 0) return this.crossword[cell[2]].index;
             return null;
         },
         calculateGridSize() {
@@ -448,33 +570,15 @@ const CrosswordApp = {
             return answer.split('');  // Convert string to array of characters
         },
         find_solution(rowIndex, cellIndex) {
-            for (const word of this.crossword) {
-                if (word.direction === 'across' && word.y === rowIndex && 
-                    cellIndex >= word.x && cellIndex < word.x + word.answer.length) {
-                    return word.answer[cellIndex - word.x];
-                }
-            }
-            return null;
+            const cell = this.cells[rowIndex]?.[cellIndex];
+            if (!cell || cell[0] < 0) return null;
+            return this.crossword[cell[0]].answer[cell[1]];
         },
         findCurrentWord(rowIndex, cellIndex) {
-            for (const word of this.crossword) {
-                if (word.direction === this.direction) {
-                    if (word.direction === 'across') {
-                        if (word.y === rowIndex && 
-                            cellIndex >= word.x && 
-                            cellIndex < word.x + word.answer.length) {
-                            return word;
-                        }
-                    } else {
-                        if (word.x === cellIndex && 
-                            rowIndex >= word.y && 
-                            rowIndex < word.y + word.answer.length) {
-                            return word;
-                        }
-                    }
-                }
-            }
-            return null;
+            const cell = this.cells[rowIndex]?.[cellIndex];
+            if (!cell) return null;
+            const id = this.direction === 'across' ? cell[0] : cell[2];
+            return id >= 0 ? this.crossword[id] : null;
         },
         findNextWord(currentWord) {
             if (!currentWord) return null;
@@ -606,18 +710,26 @@ const CrosswordApp = {
             let successfulCaches = 0;
             
             try {
-                for (let i = 0; i < count && this.cachedCrosswordsCount[day] < 50; i++) {
+                // Ask the server for puzzles in batches; it fetches and builds them concurrently
+                let remaining = count;
+                while (remaining > 0 && this.cachedCrosswordsCount[day] < 50) {
+                    const batchSize = Math.min(remaining, 25, 50 - this.cachedCrosswordsCount[day]);
                     try {
-                        const response = await axios.get(`${this.baseUrl}/random_crossword/${day}`);
-                        await this.cacheCrossword(day, response.data);
-                        successfulCaches++;
+                        // Background work: the server sheds it first when upstream is busy
+                        const response = await axios.get(`${this.baseUrl}/random_crossword/${day}`, {
+                            params: { count: batchSize, format: 'compact', priority: 'prefetch', have: this.haveBitmap(day) }
+                        });
+                        response.data.puzzles.forEach(puzzle => this.cacheCrossword(day, puzzle));
+                        successfulCaches += response.data.puzzles.length;
+                        remaining -= batchSize;
                         this.cachingErrors[day] = 0;
-                        await new Promise(resolve => setTimeout(resolve, 100));
                     } catch (error) {
-                        console.error(`Error caching ${day} crossword:`, error);
+                        console.error(`Error caching ${day} crosswords:`, error);
                         this.cachingErrors[day]++;
                         if (this.cachingErrors[day] > 3) break;
-                        await new Promise(resolve => setTimeout(resolve, 1000));
+                        // A 503 says when upstream has room again
+                        const retryAfter = Number(error.response?.headers?.['retry-after']) || 1;
+                        await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
                     }
                 }
             } finally {
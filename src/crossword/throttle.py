@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from .metrics import metrics
+
+INTERACTIVE = "interactive"
+PREFETCH = "prefetch"
+
+# Priority of the upstream fetches made for the current request or thread
+_priority: ContextVar[str] = ContextVar("upstream_priority", default=INTERACTIVE)
+
+
+def set_upstream_priority(priority: Optional[str]) -> None:
+    """Mark upstream fetches from here on as ``prefetch``; anything else counts as interactive."""
+    _priority.set(PREFETCH if priority == PREFETCH else INTERACTIVE)
+
+
+def upstream_priority() -> str:
+    return _priority.get()
+
+
+class ShedError(Exception):
+    """A prefetch could not be admitted in time and was dropped."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"prefetch shed, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token bucket shared by every thread that talks to upstream.
+
+    ``rate`` tokens are added per second up to ``burst``; ``acquire`` blocks
+    until a token is available.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._take()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self) -> float:
+        """Take a token if one is available, else return seconds until the next one."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+
+class UpstreamScheduler(RateLimiter):
+    """``RateLimiter`` for the server that puts interactive fetches ahead of prefetches.
+
+    The priority comes from ``set_upstream_priority``. Interactive fetches wait
+    for a token as usual. A prefetch only takes one while no interactive fetch
+    is waiting and ``reserve`` tokens would be left for the next one; if it
+    cannot get in within ``max_wait`` seconds it is shed with ``ShedError``.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, reserve: int = 1, max_wait: float = 2.0):
+        super().__init__(rate, burst)
+        # A prefetch must always be able to get a token from a full bucket
+        self.reserve = max(0, min(reserve, burst - 1))
+        self.max_wait = max_wait
+        self._interactive_waiting = 0
+
+    def acquire(self) -> None:
+        if _priority.get() == INTERACTIVE:
+            with self._lock:
+                self._interactive_waiting += 1
+            try:
+                super().acquire()
+            finally:
+                with self._lock:
+                    self._interactive_waiting -= 1
+            return
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._admit_prefetch(deadline)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        if _priority.get() == INTERACTIVE:
+            with self._lock:
+                self._interactive_waiting += 1
+            try:
+                await super().acquire_async()
+            finally:
+                with self._lock:
+                    self._interactive_waiting -= 1
+            return
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._admit_prefetch(deadline)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def _admit_prefetch(self, deadline: float) -> float:
+        """Take a token for a prefetch, or return how long to wait; raises ``ShedError`` past ``deadline``."""
+        with self._lock:
+            self._refill()
+            if not self._interactive_waiting and self._tokens >= 1 + self.reserve:
+                self._tokens -= 1
+                return 0
+            needed = 1 + self.reserve - self._tokens
+            # Behind an interactive fetch: look again once it has had its token
+            wait = (needed if needed > 0 else 1) / self.rate
+        if time.monotonic() + wait > deadline:
+            metrics.inc("crossword_upstream_shed_total")
+            raise ShedError(wait)
+        return wait
+
+
+metrics.describe("crossword_upstream_shed_total", "Prefetch upstream fetches dropped to keep interactive ones fast.")
@@ -0,0 +1,109 @@
+import threading
+from collections import deque
+from datetime import date as date_type
+from typing import Deque, Dict, Iterable, Optional, Tuple, Union
+
+from .date_sampler import WeekdaySampler
+from .metrics import metrics
+from .puzzle_store import normalize_date
+from .resilience import UpstreamError
+from .response_cache import CachedResponse
+from .throttle import PREFETCH, set_upstream_priority
+
+
+class WarmPool:
+    """Per-weekday queues of ready-to-send random puzzles, refilled by a background thread.
+
+    When a weekday drops below ``low`` puzzles the worker tops it up to ``high``,
+    so a random pick is usually served from memory instead of from upstream.
+    ``high=0`` disables the pool. The thread starts on first use, so forked
+    server workers each get their own.
+    """
+
+    def __init__(self, service, sampler: WeekdaySampler, low: int = 2, high: int = 0, interval: float = 60.0):
+        self.service = service
+        self.sampler = sampler
+        self.low = low
+        self.high = high
+        self.interval = interval
+        self._pools: Dict[int, Deque[Tuple[str, CachedResponse]]] = {weekday: deque() for weekday in range(7)}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.high > 0
+
+    def size(self, weekday: int) -> int:
+        return len(self._pools[weekday])
+
+    def pop(self, weekday: int, exclude: Iterable[Union[str, date_type]] = ()) -> Optional[Tuple[str, CachedResponse]]:
+        """Take a pooled ``(date, puzzle)`` for ``weekday`` whose date is not in ``exclude``, if there is one.
+
+        ``exclude`` holds dates or date strings in any form ``normalize_date`` accepts;
+        unparseable ones are ignored, as ``WeekdaySampler.sample`` does.
+        """
+        if not self.enabled:
+            return None
+        self.start()
+        excluded = set()
+        for key in exclude:
+            try:
+                excluded.add(normalize_date(key))
+            except ValueError:
+                continue
+        found = None
+        with self._lock:
+            pool = self._pools[weekday]
+            for entry in pool:
+                if entry[0] not in excluded:
+                    found = entry
+                    break
+            if found is not None:
+                pool.remove(found)
+            if len(pool) < self.low:
+                self._wake.set()
+        metrics.inc("crossword_warm_pool_hits_total" if found else "crossword_warm_pool_misses_total")
+        return found
+
+    def fill(self) -> int:
+        """Top up every weekday that is below the low watermark; returns the number of puzzles added."""
+        added = 0
+        for weekday, pool in self._pools.items():
+            if len(pool) >= self.low:
+                continue
+            with self._lock:
+                held = [date for date, _ in pool]
+            for day in self.sampler.sample(weekday, self.high - len(held), held):
+                date = day.strftime("%y%m%d")
+                try:
+                    cached = self.service.get_puzzle(date, weekday)
+                except UpstreamError:
+                    # Upstream is struggling; leave the rest for the next round
+                    return added
+                except Exception as e:
+                    print(f"Warm pool skipping {date}: {e!r}")
+                    continue
+                with self._lock:
+                    pool.append((date, cached))
+                added += 1
+        return added
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="warm-pool", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        # Filling ahead of demand must not hold up requests a user is waiting on
+        set_upstream_priority(PREFETCH)
+        while True:
+            self.fill()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+metrics.describe("crossword_warm_pool_hits_total", "Random puzzles served from the warm pool.")
+metrics.describe("crossword_warm_pool_misses_total", "Random puzzle requests the warm pool could not serve.")
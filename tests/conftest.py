@@ -1,4 +1,6 @@
 import pytest
+from benchmarks.synthetic import generate_payload
+
 from .factories import CrosswordFactory
 
 
@@ -48,4 +50,43 @@ def simple_crossword():
             {'hint': "Pirate", 'answer': "ARE"},
             {'hint': "Consume", 'answer': "TEA"}
         ]
-    ) 
\ No newline at end of file
+    )
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def upstream(monkeypatch, simple_crossword):
+    """Stand-in for nytsyn that serves ``simple_crossword`` for any date and records calls."""
+    calls = []
+
+    def get(url, params=None, **kwargs):
+        date = params["date"][-6:]
+        calls.append(date)
+        return FakeResponse(generate_payload(simple_crossword.model_copy(update={"date": date})))
+
+    monkeypatch.setattr("crossword.data_reader.requests.get", get)
+    return calls
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, upstream):
+    """Flask test client backed by a throwaway puzzle store."""
+    from crossword import app as app_module
+    from crossword.data_reader import DataReader
+    from crossword.date_sampler import WeekdaySampler
+    from crossword.puzzle_store import PuzzleStore
+    from crossword.service import PuzzleService
+
+    store = PuzzleStore(str(tmp_path / "store"))
+    reader = DataReader(store=store)
+    monkeypatch.setattr(app_module, "store", store)
+    monkeypatch.setattr(app_module, "archive_sampler", WeekdaySampler(available=store))
+    monkeypatch.setattr(app_module, "reader", reader)
+    monkeypatch.setattr(app_module, "service", PuzzleService(reader))
+    return app_module.app.test_client()
@@ -21,4 +21,4 @@ class CrosswordFactory(factory.Factory):
     date = ""
     title = ""
     authors = []
-    size = {}
\ No newline at end of file
+    size = {}
@@ -0,0 +1,112 @@
+import threading
+
+from crossword.answer_index import AnswerIndex
+from crossword.archive import SQLiteArchive
+from crossword.crossword_builder import build_entries
+
+from .test_archive import make_crossword
+
+
+def test_pattern_matches_known_letters(sample_crossword):
+    index = AnswerIndex()
+    index.add("231026", build_entries(sample_crossword))
+
+    assert [match.answer for match in index.match("_ED")] == ["RED", "TED"]
+    assert [match.answer for match in index.match("c?t")] == ["CAT"]
+    assert index.match("XYZ") == []
+    assert index.match("____________") == []
+
+
+def test_rebus_answers_are_flattened(sample_crossword):
+    index = AnswerIndex()
+    index.add("231026", build_entries(sample_crossword))
+
+    # The "A,B,C" rebus cell makes the 3-cell 1 down spell five letters
+    assert [match.answer for match in index.match("C_B__")] == ["CABCR"]
+    assert index.match("C_R") == []
+
+
+def test_counts_occurrences_once_per_puzzle_slot(simple_crossword):
+    index = AnswerIndex()
+    index.add("231026", build_entries(simple_crossword))
+    index.add("231026", build_entries(simple_crossword))
+    index.add("231102", build_entries(simple_crossword))
+
+    (tea,) = index.match("T_A")
+    assert tea.count == 4
+    assert tea.dates == ["231102", "231026"]
+
+
+def test_refresh_only_reads_new_archive_rows(tmp_path):
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    archive.save(make_crossword("231027"))
+    archive.flush()
+    index = AnswerIndex()
+    assert index.refresh(archive) == 6
+
+    archive.save(make_crossword("231103"))
+    archive.flush()
+    assert index.refresh(archive) == 6
+    assert index.refresh(archive) == 0
+    assert index.match("_RE")[0].count == 4
+
+
+def test_refresh_replaces_rewritten_puzzles(tmp_path):
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    archive.save(make_crossword("231027"))
+    archive.save(make_crossword("231103"))
+    archive.flush()
+    index = AnswerIndex()
+    index.refresh(archive)
+
+    rewritten = make_crossword("231027")
+    rewritten.grid = ["COT", "ORE", "TEA"]
+    archive.save(rewritten)
+    archive.flush()
+    assert index.refresh(archive) == 6
+    assert [(match.answer, match.count, match.dates) for match in index.match("C_T")] == [
+        ("CAT", 2, ["231103"]), ("COT", 2, ["231027"]),
+    ]
+
+    # Answers no puzzle uses any more stop matching
+    archive.save(make_crossword("231027"))
+    archive.flush()
+    index.refresh(archive)
+    assert [match.answer for match in index.match("C_T")] == ["CAT"]
+    assert index.match("O_E") == []
+    assert len(index) == 3
+
+
+def test_answers_endpoint(client, tmp_path, monkeypatch):
+    from crossword import app as app_module
+
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    archive.save(make_crossword("231027"))
+    archive.flush()
+    monkeypatch.setattr(app_module, "archive", archive)
+    monkeypatch.setattr(app_module, "answer_index", AnswerIndex())
+
+    body = client.get("/answers?pattern=_A_").get_json()
+    assert body["matches"] == [{"answer": "CAT", "count": 2, "dates": ["231027"]}]
+
+
+def test_answers_endpoint_waits_out_the_initial_load(client, tmp_path, monkeypatch):
+    from crossword import app as app_module
+
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    archive.save(make_crossword("231027"))
+    archive.flush()
+    release = threading.Event()
+    clue_changes = archive.clue_changes
+    monkeypatch.setattr(archive, "clue_changes", lambda since: release.wait() and clue_changes(since))
+    monkeypatch.setattr(app_module, "archive", archive)
+    monkeypatch.setattr(app_module, "answer_index", AnswerIndex())
+    monkeypatch.setattr(app_module, "ANSWER_INDEX_WAIT", 0.01)
+
+    response = client.get("/answers?pattern=_A_")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+    release.set()
+    assert app_module.answer_index.wait(5)
+    assert client.get("/answers?pattern=_A_").get_json()["matches"][0]["answer"] == "CAT"
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+
+def test_random_crossword_returns_single_puzzle(client):
+    response = client.get('/random_crossword/Tuesday')
+
+    assert response.status_code == 200
+    puzzle = response.get_json()
+    assert datetime.strptime(puzzle["metadata"]["date"], "%y%m%d").weekday() == 1
+    assert len(puzzle["entries"]) == 6
+    assert puzzle["cells"][1][2] == [1, 2, 5, 1]
+
+
+def test_random_crossword_batch_returns_distinct_puzzles(client, upstream):
+    response = client.get('/random_crossword/friday?count=5')
+
+    puzzles = response.get_json()["puzzles"]
+    dates = [puzzle["metadata"]["date"] for puzzle in puzzles]
+    assert len(dates) == 5
+    assert len(set(dates)) == 5
+    assert all(datetime.strptime(date, "%y%m%d").weekday() == 4 for date in dates)
+    assert sorted(upstream) == sorted(dates)
+
+
+def test_random_crossword_batch_is_capped(client):
+    response = client.get('/random_crossword/monday?count=500')
+
+    assert len(response.get_json()["puzzles"]) == 50
+
+
+def test_random_crossword_rejects_unknown_weekday(client):
+    assert client.get('/random_crossword/caturday').data == b'Invalid weekday'
+
+
+def test_random_crossword_honours_exclusions(client):
+    response = client.get('/random_crossword/monday?archived=1')
+    assert response.status_code == 404
+
+    client.get('/crossword/231023')
+    response = client.get('/random_crossword/monday?archived=1')
+    assert response.get_json()["metadata"]["date"] == "231023"
+
+    response = client.get('/random_crossword/monday?archived=1&exclude=231023')
+    assert response.status_code == 404
+
+
+def test_malformed_upstream_payload_is_bad_gateway(client, monkeypatch):
+    from crossword import app as app_module
+
+    monkeypatch.setattr(app_module.reader, "_fetch_data", lambda date: "ARCHIVE\n\n231026\n")
+    response = client.get('/random_crossword/thursday')
+
+    assert response.status_code == 502
+
+
+def test_metrics_endpoint_reports_stage_timings(client):
+    response = client.get('/random_crossword/wednesday?count=2')
+    assert 'fetch;dur=' in response.headers['Server-Timing']
+
+    body = client.get('/metrics').get_data(as_text=True)
+
+    assert '# TYPE crossword_stage_seconds histogram' in body
+    for stage in ('upstream', 'fetch', 'parse', 'build', 'serialize'):
+        assert f'crossword_stage_seconds_count{{stage="{stage}"}}' in body
+    assert 'crossword_request_seconds_bucket{endpoint="get_random_crossword",le="+Inf"}' in body
+    assert 'crossword_store_misses_total' in body
+
+
+def test_puzzle_by_date_is_cached_and_conditional(client, upstream):
+    first = client.get('/puzzle/20231026')
+    assert first.status_code == 200
+    assert first.get_json()["metadata"]["date"] == "231026"
+    etag = first.headers['ETag']
+
+    second = client.get('/puzzle/231026')
+    assert second.data == first.data
+    assert upstream == ["231026"]
+
+    not_modified = client.get('/puzzle/231026', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+    assert client.get('/puzzle/tomorrow').status_code == 400
+
+
+def test_puzzle_in_compact_format(client):
+    full = client.get("/puzzle/231026")
+    compact = client.get("/puzzle/231026?format=compact")
+    negotiated = client.get("/puzzle/231026", headers={"Accept": "application/vnd.crossword.compact+json"})
+
+    assert compact.get_json()["format"] == "compact"
+    assert compact.mimetype == "application/vnd.crossword.compact+json"
+    assert full.mimetype == "application/json"
+    assert negotiated.data == compact.data
+    batch = client.get("/random_crossword/thursday?count=2&format=compact")
+    assert batch.mimetype == "application/vnd.crossword.compact+json"
+    assert compact.headers["ETag"] != full.headers["ETag"]
+    assert "Accept" in compact.headers["Vary"]
+
+
+def test_random_crossword_skips_dates_the_client_has(client, monkeypatch):
+    from datetime import date
+
+    from crossword import app as app_module
+    from crossword.date_sampler import WeekdaySampler, encode_held
+
+    monkeypatch.setattr(app_module, "sampler", WeekdaySampler(begin=date(2023, 10, 1), end=date(2023, 11, 1)))
+    have = encode_held(3, [date(2023, 10, 5), date(2023, 10, 12), date(2023, 10, 19)])
+
+    puzzle = client.get(f"/random_crossword/thursday?have={have}").get_json()
+    assert puzzle["metadata"]["date"] == "231026"
+    batch = client.get(f"/random_crossword/thursday?count=5&have={have}").get_json()["puzzles"]
+    assert [puzzle["metadata"]["date"] for puzzle in batch] == ["231026"]
+    assert client.get("/random_crossword/thursday?have=***").status_code == 400
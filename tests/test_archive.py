@@ -0,0 +1,145 @@
+import sqlite3
+
+from crossword.archive import SQLiteArchive
+from crossword.scraper import usecase
+from .factories import CrosswordFactory
+
+
+def make_crossword(date, title="Puzzle", authors=("Jane Doe",)):
+    return CrosswordFactory(
+        date=date,
+        title=title,
+        authors=list(authors),
+        size={'rows': 3, 'cols': 3},
+        grid=["CAT", "ARE", "TEA"],
+        across=[{'hint': "Feline"}, {'hint': "To be"}, {'hint': "Hot drink"}],
+        down=[{'hint': "Vehicle"}, {'hint': "Pirate"}, {'hint': "Consume"}],
+    )
+
+
+def test_archive_round_trips_crossword(tmp_path):
+    crossword = make_crossword("231027")
+    with SQLiteArchive(str(tmp_path / "archive.db")) as archive:
+        archive.save(crossword)
+
+    reopened = SQLiteArchive(str(tmp_path / "archive.db"))
+    assert reopened.get("231027") == crossword
+    assert reopened.get("231028") is None
+    answers = reopened.connection.execute(
+        "SELECT answer FROM clues WHERE date = '231027' AND direction = 'down' ORDER BY position"
+    ).fetchall()
+    assert [answer for answer, in answers] == ["CAT", "ARE", "TEA"]
+
+
+def test_archive_batches_writes(tmp_path):
+    archive = SQLiteArchive(str(tmp_path / "archive.db"), batch_size=2)
+    archive.save(make_crossword("231027"))
+    assert len(archive) == 0
+    archive.save(make_crossword("231103"))
+    assert len(archive) == 2
+
+
+def test_archive_finds_by_weekday_author_and_title(tmp_path):
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    archive.save(make_crossword("231027", authors=["Jane Doe", "Will Shortz"]))
+    archive.save(make_crossword("231103", title="Fun", authors=["John Roe"]))
+    archive.save(make_crossword("231104", authors=["Jane Doe"]))
+    archive.flush()
+
+    fridays_by_jane = archive.find(weekday=4, author="jane doe")
+    assert [row["date"] for row in fridays_by_jane] == ["231027"]
+    assert fridays_by_jane[0]["authors"] == ["Jane Doe", "Will Shortz"]
+    assert [row["date"] for row in archive.find(title="FUN")] == ["231103"]
+    assert [row["date"] for row in archive.find(start="2023-11-01")] == ["231103", "231104"]
+
+
+def test_usecase_writes_to_archive(tmp_path, upstream):
+    from datetime import datetime
+    from crossword.data_reader import DataReader
+
+    with SQLiteArchive(str(tmp_path / "archive.db")) as archive:
+        usecase(DataReader(), archive, datetime(2023, 10, 1), datetime(2023, 10, 3))
+        archive.flush()
+        assert [row["date"] for row in archive.find()] == ["231001", "231002", "231003"]
+
+
+def test_archive_search_ranks_and_pages(tmp_path):
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    archive.save(make_crossword("231027"))
+    archive.save(make_crossword("231103"))
+    archive.flush()
+
+    results = archive.search("hot drink")
+    assert [(row["date"], row["answer"]) for row in results] == [("231103", "TEA"), ("231027", "TEA")]
+    assert {row["hint"] for row in archive.search("tea")} == {"Hot drink", "Consume"}
+    assert [row["date"] for row in archive.search("feline", limit=1, offset=1)] == ["231027"]
+    assert archive.search('" OR *') == []
+    # Underscores split words as the tokenizer does, rather than making a phrase query
+    assert archive.search("feline_x") == []
+    assert [row["answer"] for row in archive.search("hot_drink", limit=1)] == ["TEA"]
+
+    # Re-saving a puzzle replaces its clues in the index rather than duplicating them
+    archive.save(make_crossword("231027"))
+    archive.flush()
+    assert len(archive.search("hot drink")) == 2
+
+
+def test_clue_changes_follow_writes(tmp_path):
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    archive.save(make_crossword("231027"))
+    archive.save(make_crossword("231103"))
+    archive.flush()
+    changes = archive.clue_changes()
+    assert changes.dates == ["231027", "231103"] and len(changes.clues) == 12
+
+    archive.save(make_crossword("231027"))
+    archive.flush()
+    later = archive.clue_changes(changes.seq)
+    assert later.dates == ["231027"]
+    assert ("231027", "across", 1, "CAT") in later.clues
+    assert archive.clue_changes(later.seq).dates == []
+
+    # Archives written before the log existed list every puzzle once
+    archive.connection.executescript("DROP TABLE puzzle_writes; DROP TRIGGER puzzles_written;")
+    archive.close()
+    assert SQLiteArchive(str(tmp_path / "archive.db")).clue_changes().dates == ["231027", "231103"]
+
+
+def test_archive_search_pages_do_not_overlap(tmp_path, monkeypatch):
+    from crossword import archive as archive_module
+
+    monkeypatch.setattr(archive_module, "SEARCH_CANDIDATES", 4)
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    for day in range(1, 6):
+        archive.save(make_crossword(f"2310{day:02d}"))
+    archive.flush()
+
+    everything = archive.search("tea", limit=100)
+    assert len(everything) == 10
+    pages = [archive.search("tea", limit=3, offset=offset) for offset in range(0, 12, 3)]
+    assert [row for page in pages for row in page] == everything
+    # The answer match ranks first within the newest block
+    assert (everything[0]["date"], everything[0]["answer"]) == ("231005", "TEA")
+
+
+def test_search_endpoint(client, tmp_path, monkeypatch):
+    from crossword import app as app_module
+
+    archive = SQLiteArchive(str(tmp_path / "archive.db"))
+    for day in range(1, 25):
+        archive.save(make_crossword(f"2310{day:02d}"))
+    archive.flush()
+    monkeypatch.setattr(app_module, "archive", archive)
+
+    first = client.get("/search?q=pirate").get_json()
+    assert len(first["results"]) == 20 and first["has_more"]
+    second = client.get("/search?q=pirate&page=2").get_json()
+    assert len(second["results"]) == 4 and not second["has_more"]
+    assert client.get("/search?q=pirate_flag").status_code == 200
+
+    def unsupported(*args, **kwargs):
+        raise sqlite3.OperationalError("fts5: syntax error")
+
+    monkeypatch.setattr(archive, "search", unsupported)
+    assert client.get("/search?q=pirate").status_code == 400
+    assert second["results"][0]["answer"] == "ARE"
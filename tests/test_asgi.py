@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from benchmarks.synthetic import generate_payload
+
+
+@pytest.fixture
+def asgi_client(tmp_path, monkeypatch, simple_crossword):
+    """Run requests against the ASGI app, with nytsyn replaced by an in-process transport."""
+    from crossword import asgi
+    from crossword.async_reader import AsyncDataReader
+    from crossword.puzzle_store import PuzzleStore
+    from crossword.service import AsyncPuzzleService
+
+    calls = []
+
+    def upstream(request):
+        date = request.url.params["date"][-6:]
+        calls.append(date)
+        if date == "991231":
+            return httpx.Response(404)
+        return httpx.Response(200, text=generate_payload(simple_crossword.model_copy(update={"date": date})))
+
+    reader = AsyncDataReader(store=PuzzleStore(str(tmp_path / "store")),
+                             client=httpx.AsyncClient(transport=httpx.MockTransport(upstream)))
+    monkeypatch.setattr(asgi, "reader", reader)
+    monkeypatch.setattr(asgi, "service", AsyncPuzzleService(reader))
+
+    def request(*requests):
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi.app),
+                                         base_url="http://test") as client:
+                return await asyncio.gather(*(client.request(kwargs.pop("method", "GET"), url, **kwargs) for url, kwargs in requests))
+        return asyncio.run(run())
+
+    request.calls = calls
+    return request
+
+
+def test_puzzle_is_built_and_revalidated(asgi_client):
+    (response,) = asgi_client(("/puzzle/20231026", {}))
+    assert response.status_code == 200
+    assert response.json()["metadata"]["date"] == "231026"
+    assert "fetch;dur=" in response.headers["server-timing"]
+
+    (revalidated,) = asgi_client(("/puzzle/231026", {"headers": {"If-None-Match": response.headers["etag"]}}))
+    assert revalidated.status_code == 304
+    assert asgi_client.calls == ["231026"]
+
+
+def test_random_batch_fetches_concurrently(asgi_client):
+    (response,) = asgi_client(("/random_crossword/thursday?count=5", {}))
+    puzzles = json.loads(response.content)["puzzles"]
+    assert len(puzzles) == 5
+    assert len(set(asgi_client.calls)) == 5
+    assert response.headers["content-type"] == "application/json"
+
+    (compact,) = asgi_client(("/random_crossword/thursday?count=2&format=compact", {}))
+    assert compact.headers["content-type"] == "application/vnd.crossword.compact+json"
+
+
+def test_missing_puzzle_is_404_without_retries(asgi_client):
+    missing, = asgi_client(("/puzzle/991231", {}))
+    assert missing.status_code == 404
+    assert asgi_client.calls == ["991231"]
+
+
+def test_invalid_date_and_flask_fallback(asgi_client):
+    invalid, index = asgi_client(("/puzzle/notadate", {}), ("/", {}))
+    assert invalid.status_code == 400
+    assert index.status_code == 200
+
+
+def test_puzzle_routes_only_answer_get_and_head(asgi_client):
+    head, post = asgi_client(("/puzzle/231026", {"method": "HEAD"}), ("/puzzle/231026", {"method": "POST"}))
+    assert head.status_code == 200 and head.content == b""
+    assert int(head.headers["content-length"]) > 0
+    assert post.status_code == 405 and post.headers["allow"] == "GET, HEAD"
+    assert asgi_client.calls == ["231026"]
+
+
+def test_puzzles_are_built_off_the_event_loop(asgi_client, monkeypatch):
+    from crossword import service
+
+    threads = []
+
+    def build_response(*args):
+        threads.append(threading.current_thread())
+        return build(*args)
+
+    build = service.build_response
+    monkeypatch.setattr(service, "build_response", build_response)
+    (response,) = asgi_client(("/puzzle/231026", {}))
+    assert response.status_code == 200
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,41 @@
+import gzip
+import re
+
+from crossword.assets import AssetManifest
+
+
+def test_manifest_fingerprints_and_compresses_text_only(tmp_path):
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "app.js").write_text("console.log('hello');\n" * 50)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + bytes(100))
+    manifest = AssetManifest(str(tmp_path)).build()
+
+    url = manifest.url("lib/app.js")
+    assert re.fullmatch(r"/assets/lib/app\.[0-9a-f]{12}\.js", url)
+    script = manifest.get(url[len("/assets/"):])
+    assert gzip.decompress(script.gzipped) == script.body
+    assert manifest.get(manifest.url("logo.png")[len("/assets/"):]).gzipped is None
+    assert manifest.url("missing.js") is None
+
+    (tmp_path / "lib" / "app.js").write_text("console.log('changed');\n")
+    assert AssetManifest(str(tmp_path)).build().url("lib/app.js") != url
+
+
+def test_index_links_fingerprinted_assets_served_gzipped(client):
+    index = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert index.headers["Cache-Control"] == "no-cache"
+    html = gzip.decompress(index.data).decode()
+    script_url = re.search(r'src="(/assets/main\.[0-9a-f]{12}\.js)"', html).group(1)
+
+    script = client.get(script_url, headers={"Accept-Encoding": "gzip"})
+    assert script.headers["Content-Encoding"] == "gzip"
+    assert "immutable" in script.headers["Cache-Control"]
+    assert b"expandPuzzle" in gzip.decompress(script.data)
+    plain = client.get(script_url)
+    assert plain.headers.get("Content-Encoding") is None
+    assert plain.headers["ETag"] != script.headers["ETag"]
+    assert client.get(script_url, headers={"If-None-Match": plain.headers["ETag"]}).status_code == 304
+    revalidated = client.get(script_url, headers={"If-None-Match": script.headers["ETag"], "Accept-Encoding": "gzip"})
+    assert revalidated.status_code == 304
+    assert client.get(script_url, headers={"If-None-Match": script.headers["ETag"]}).status_code == 200
+    assert client.get("/assets/main.000000000000.js").status_code == 404
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks.synthetic import generate_crossword, generate_payload
+from crossword.binary_archive import BinaryArchive, write_archive
+
+
+def test_round_trips_crosswords_with_rebus_cells(tmp_path, sample_crossword, simple_crossword):
+    sample_crossword = sample_crossword.model_copy(update={"date": "231026", "size": {"rows": 3, "cols": 5}})
+    simple_crossword = simple_crossword.model_copy(update={"date": "231027", "size": {"rows": 3, "cols": 3}})
+    path = str(tmp_path / "puzzles.xwa")
+    assert write_archive(path, [simple_crossword, sample_crossword]) == 2
+
+    with BinaryArchive(path) as archive:
+        assert archive.dates() == ["231026", "231027"]
+        assert archive.get("231026") == sample_crossword
+        assert archive.get("231027") == simple_crossword
+        assert archive.get("231028") is None
+        assert "231027" in archive
+
+
+def test_is_several_times_smaller_than_the_upstream_text(tmp_path):
+    crosswords = [generate_crossword(15, rebus_rate=0.02, seed=day).model_copy(update={"date": f"2310{day:02d}"})
+                  for day in range(1, 29)]
+    path = tmp_path / "puzzles.xwa"
+    write_archive(str(path), crosswords)
+
+    assert path.stat().st_size < sum(len(generate_payload(crossword)) for crossword in crosswords) / 3
+    assert [crossword.date for crossword in BinaryArchive(str(path)).crosswords()] == [c.date for c in crosswords]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-an-archive"
+    path.write_bytes(b"ARCHIVE\n\n231026" + bytes(32))
+    with pytest.raises(ValueError):
+        BinaryArchive(str(path))
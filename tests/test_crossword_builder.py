@@ -1,5 +1,5 @@
 import pytest
-from crossword.crossword_builder import build_crossword
+from crossword.crossword_builder import build_crossword, build_entries, build_entries_with_cells
 from crossword.crossword_builder import process_rebus_grid
 from .factories import CrosswordFactory
 
@@ -78,4 +78,24 @@ def test_build_crossword_with_repeated_rebus():
     processed_grid, rebus_map = process_rebus_grid(grid)
     print(f"Processed grid: {processed_grid}")
     print(f"Rebus map: {rebus_map}")
-    assert processed_grid[-1][-1]=="+"
\ No newline at end of file
+    assert processed_grid[-1][-1]=="+"
+
+
+def test_crossing_index_points_each_cell_at_its_words(sample_crossword):
+    entries, cells = build_entries_with_cells(sample_crossword)
+    assert entries == build_entries(sample_crossword)
+
+    grid, _ = process_rebus_grid(sample_crossword.grid)
+    for y, row in enumerate(grid):
+        for x, char in enumerate(row):
+            if char == "#":
+                assert cells[y][x] is None
+                continue
+            across, across_pos, down, down_pos = cells[y][x]
+            if across >= 0:
+                word = entries[across]
+                assert (word.direction, word.y, word.x + across_pos) == ("across", y, x)
+            if down >= 0:
+                word = entries[down]
+                assert (word.direction, word.x, word.y + down_pos) == ("down", x, y)
+            assert across >= 0 or down >= 0
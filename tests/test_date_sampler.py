@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+
+from crossword.date_sampler import WeekdaySampler, encode_held, held_dates
+from crossword.puzzle_store import PuzzleStore
+
+
+def test_sample_stays_on_weekday_and_in_range():
+    sampler = WeekdaySampler(begin=date(2010, 1, 1), end=date(2011, 1, 1))
+
+    days = sampler.sample(6, 52)
+
+    assert len(set(days)) == 52
+    assert all(day.weekday() == 6 and date(2010, 1, 1) <= day < date(2011, 1, 1) for day in days)
+    assert sampler.count(6) == 52
+    assert sampler.count(4) == 53  # 2010 starts on a Friday
+
+
+def test_sample_skips_excluded_dates():
+    sampler = WeekdaySampler(begin=date(2023, 10, 1), end=date(2023, 11, 1))
+    thursdays = ["231005", "231012", "231019", "231026"]
+
+    assert sampler.sample(3, 5, exclude=thursdays[:3]) == [date(2023, 10, 26)]
+    assert sampler.sample(3, 1, exclude=thursdays) == []
+
+
+def test_sample_restricted_to_available_dates():
+    available = ["231026", "231102", "231103"]
+    sampler = WeekdaySampler(available=available)
+
+    assert sorted(sampler.sample(3, 10)) == [date(2023, 10, 26), date(2023, 11, 2)]
+    assert sampler.sample(3, 10, exclude=["231102"]) == [date(2023, 10, 26)]
+    assert sampler.sample(0, 1) == []
+
+
+def test_sampler_sees_a_store_swap_dates_without_changing_size(tmp_path):
+    store = PuzzleStore(str(tmp_path))
+    store.seed([("231026", "a" * 100), ("231102", "b" * 100)])
+    sampler = WeekdaySampler(available=store)
+    assert sampler.count(3) == 2
+    store.get("231102")
+
+    # Another worker's store: one puzzle in, the least recently read one out
+    other = PuzzleStore(str(tmp_path), max_bytes=store.total_bytes)
+    other.put("231109", "c" * 100)
+
+    assert len(store) == 2
+    assert sorted(sampler.sample(3, 10)) == [date(2023, 11, 2), date(2023, 11, 9)]
+
+
+def test_held_bitmap_round_trips_and_excludes():
+    thursdays = [date(2010, 1, 7), date(2023, 10, 5), date(2023, 10, 12), date(2023, 10, 19)]
+    bitmap = encode_held(3, thursdays + [date(2023, 10, 20), date(2009, 12, 31)])
+
+    assert held_dates(3, bitmap) == thursdays
+    assert held_dates(3, "") == []
+    sampler = WeekdaySampler(begin=date(2023, 10, 1), end=date(2023, 11, 1))
+    assert sampler.sample(3, 5, exclude=held_dates(3, bitmap)) == [date(2023, 10, 26)]
+    with pytest.raises(ValueError):
+        held_dates(3, "not*base64")
@@ -0,0 +1,65 @@
+import pytest
+from crossword.grid_analysis import GridLayout, LayoutCache, WordSpan, analyze_grid, analyze_grids, shape_key
+
+
+def test_analyze_grid_numbers_and_spans():
+    layout = analyze_grid([
+        "CAT#",
+        "A+ED",
+        "#EAR",
+    ])
+
+    assert layout == GridLayout(
+        width=4,
+        height=3,
+        across=[WordSpan(1, 0, 0, 3), WordSpan(4, 0, 1, 4), WordSpan(6, 1, 2, 3)],
+        down=[WordSpan(1, 0, 0, 2), WordSpan(2, 1, 0, 3), WordSpan(3, 2, 0, 3), WordSpan(5, 3, 1, 2)],
+    )
+
+
+def test_analyze_grid_handles_empty_grid():
+    assert analyze_grid([]) == GridLayout(0, 0, [], [])
+
+
+def test_analyze_grids_matches_single_grid_path():
+    grids = [
+        ["CAT#", "A+ED", "#EAR"],
+        ["#AB#", "ABCD", "#CD#"],
+        ["AB", "A"],  # ragged, handled one at a time
+    ]
+    assert analyze_grids(grids) == [analyze_grid(rows) for rows in grids]
+
+
+def test_analyze_grids_numpy_path():
+    pytest.importorskip("numpy")
+    grids = [["".join("#" if (x * y + b) % 5 == 0 else "A" for x in range(15)) for y in range(15)]
+             for b in range(20)]
+    assert analyze_grids(grids) == [analyze_grid(rows) for rows in grids]
+
+
+def test_layout_cache_reuses_layouts_of_the_same_shape():
+    cache = LayoutCache(max_entries=2)
+    assert shape_key(["CAT#", "A+ED"]) == shape_key(["DOG#", "XYZW"])
+    assert shape_key(["AB", "C"]) != shape_key(["A", "BC"])
+
+    assert cache.layout(["CAT#", "A+ED", "#EAR"]) == analyze_grid(["CAT#", "A+ED", "#EAR"])
+    assert cache.layout(["DOG#", "XYZW", "#QRS"]) is cache.layout(["CAT#", "A+ED", "#EAR"])
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache.layout(["AB", "CD"])
+    cache.layout(["A#", "CD"])
+    assert len(cache) == 2
+    cache.layout(["CAT#", "A+ED", "#EAR"])
+    assert cache.misses == 4 and cache.hit_rate == 2 / 6
+
+
+def test_layout_cache_analyzes_a_batch_of_misses_together():
+    cache = LayoutCache()
+    cache.layout(["CAT#", "A+ED", "#EAR"])
+    grids = [["DOG#", "XYZW", "#QRS"], ["#AB#", "ABCD", "#CD#"], ["AB", "A"], ["#XY#", "WXYZ", "#WZ#"]]
+
+    layouts = cache.layouts(grids)
+    assert layouts == [analyze_grid(rows) for rows in grids]
+    assert layouts[3] is layouts[1]
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 3)
+    assert cache.layouts(grids[1:3]) == layouts[1:3] and cache.hits == 4
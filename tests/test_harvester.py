@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from crossword.data_reader import DataReader
+from crossword.harvester import Checkpoint, Harvester
+from crossword.resilience import CircuitBreaker
+from crossword.throttle import RateLimiter
+
+
+class ListWriter:
+    def __init__(self):
+        self.saved = []
+
+    def save(self, crossword):
+        self.saved.append(crossword.date)
+
+
+def test_harvest_fetches_every_date_and_checkpoints(tmp_path, upstream):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    writer = ListWriter()
+    harvester = Harvester(DataReader(), workers=4, checkpoint=Checkpoint(checkpoint_path))
+
+    stats = harvester.run(datetime(2023, 10, 1), datetime(2023, 10, 10), writer)
+
+    assert stats["fetched"] == 10
+    assert sorted(writer.saved) == [f"2310{day:02d}" for day in range(1, 11)]
+    assert len(Checkpoint(checkpoint_path).done) == 10
+
+
+def test_harvest_resumes_from_checkpoint(tmp_path, upstream):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.mark("20231001")
+    checkpoint.mark("20231002")
+    checkpoint.save()
+
+    harvester = Harvester(DataReader(), workers=2, checkpoint=Checkpoint(checkpoint.path))
+    stats = harvester.run(datetime(2023, 10, 1), datetime(2023, 10, 4))
+
+    assert stats["fetched"] == 2
+    assert sorted(upstream) == ["231003", "231004"]
+
+
+def test_harvest_writes_puzzles_already_in_the_store(tmp_path, upstream):
+    from crossword.puzzle_store import PuzzleStore
+
+    reader = DataReader(store=PuzzleStore(str(tmp_path / "store")))
+    Harvester(reader, workers=2).run(datetime(2023, 10, 1), datetime(2023, 10, 3))
+    assert len(upstream) == 3
+
+    writer = ListWriter()
+    stats = Harvester(reader, workers=2).run(datetime(2023, 10, 1), datetime(2023, 10, 4), writer)
+    assert stats["fetched"] == 4
+    assert sorted(writer.saved) == ["231001", "231002", "231003", "231004"]
+    # Only the date missing from the store went upstream
+    assert sorted(upstream) == ["231001", "231002", "231003", "231004"]
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=1000, burst=1)
+    started = datetime.now()
+    for _ in range(20):
+        limiter.acquire()
+    assert (datetime.now() - started).total_seconds() >= 0.015
+
+
+def test_harvest_waits_out_an_open_circuit(monkeypatch, upstream):
+    import crossword.data_reader
+    from requests.exceptions import ConnectionError
+
+    serve = crossword.data_reader.requests.get
+    outage = [3]
+
+    def get(url, params=None, **kwargs):
+        if outage[0]:
+            outage[0] -= 1
+            raise ConnectionError("down")
+        return serve(url, params=params, **kwargs)
+
+    monkeypatch.setattr("crossword.data_reader.requests.get", get)
+    monkeypatch.setattr("crossword.data_reader.sleep", lambda seconds: None)
+    reader = DataReader(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.05))
+    stats = Harvester(reader, workers=2).run(datetime(2023, 10, 1), datetime(2023, 10, 6))
+
+    assert (stats["fetched"], stats["failed"]) == (6, 0)
@@ -0,0 +1,35 @@
+from crossword.metrics import Metrics, server_timing, start_request_timing
+
+
+def test_render_prometheus_text():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.describe("jobs_total", "Jobs run.")
+    metrics.inc("jobs_total", kind='say "hi"')
+    metrics.inc("jobs_total", kind='say "hi"')
+    metrics.observe("latency_seconds", 0.05)
+    metrics.observe("latency_seconds", 0.5)
+    metrics.observe("latency_seconds", 5)
+
+    assert metrics.render().splitlines() == [
+        "# HELP jobs_total Jobs run.",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="say \\"hi\\""} 2',
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.550000",
+        "latency_seconds_count 3",
+    ]
+
+
+def test_stage_timings_are_collected_for_the_request():
+    metrics = Metrics()
+    timings = start_request_timing()
+    with metrics.stage("parse"):
+        pass
+    with metrics.stage("parse"):
+        pass
+
+    assert [stage for stage, _ in timings] == ["parse", "parse"]
+    assert server_timing(timings).startswith("parse;dur=")
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+from crossword.entity import Crossword
+from crossword.payload_parser import PayloadParseError
+from benchmarks.synthetic import generate_payload
+
+
+def test_parser_accepts_chunks_split_anywhere(sample_crossword):
+    crossword = sample_crossword.model_copy(
+        update={"date": "231026", "title": "Mixed Bag", "authors": ["Jane Doe", "Will Shortz"],
+                "size": {"rows": 3, "cols": 7}}
+    )
+    payload = generate_payload(crossword).encode("utf-8")
+
+    chunks = [payload[i:i + 7] for i in range(0, len(payload), 7)]
+
+    assert Crossword.from_api_response(chunks) == crossword
+    assert Crossword.from_api_response(io.StringIO(payload.decode())) == crossword
+
+
+def test_parser_drops_server_trailer(simple_crossword):
+    crossword = simple_crossword.model_copy(
+        update={"date": "231026", "authors": ["Jane Doe"], "size": {"rows": 3, "cols": 3}}
+    )
+    payload = generate_payload(crossword) + "org.apache.catalina.connector.ClientAbortException\n\nat ..."
+
+    assert Crossword.from_api_response(payload) == crossword
+
+
+def test_truncated_payload_raises_structured_error(simple_crossword):
+    payload = generate_payload(simple_crossword.model_copy(update={"size": {"rows": 3, "cols": 3}}))
+    truncated = payload.split("\n\nFeline")[0]
+
+    with pytest.raises(PayloadParseError) as excinfo:
+        Crossword.from_api_response(truncated)
+    assert excinfo.value.section == "across"
+
+    with pytest.raises(PayloadParseError) as excinfo:
+        Crossword.from_api_response("")
+    assert excinfo.value.section == "header"
+
+
+def test_non_numeric_size_raises_structured_error(simple_crossword):
+    payload = generate_payload(simple_crossword.model_copy(update={"size": {"rows": "fifteen", "cols": 3}}))
+
+    with pytest.raises(PayloadParseError) as excinfo:
+        Crossword.from_api_response(payload)
+    assert excinfo.value.section == "rows"
@@ -0,0 +1,75 @@
+import json
+from datetime import datetime
+
+import pytest
+from crossword.data_reader import DataReader
+from crossword.puzzle_store import PuzzleStore, normalize_date
+
+
+def test_normalize_date_accepts_upstream_formats():
+    assert normalize_date("231026") == "231026"
+    assert normalize_date("20231026") == "231026"
+    assert normalize_date("2023-10-26") == "231026"
+    assert normalize_date(datetime(2023, 10, 26)) == "231026"
+    with pytest.raises(ValueError):
+        normalize_date("yesterday")
+
+
+def test_store_round_trip_and_reload(tmp_path):
+    store = PuzzleStore(str(tmp_path))
+    store.put("20231026", "payload for thursday")
+
+    reopened = PuzzleStore(str(tmp_path))
+    assert "231026" in reopened
+    assert reopened.get("231026") == "payload for thursday"
+    assert reopened.get("231027") is None
+
+
+def test_stores_sharing_a_directory_keep_each_others_entries(tmp_path):
+    first, second = PuzzleStore(str(tmp_path)), PuzzleStore(str(tmp_path))
+    first.put("231026", "thursday")
+    second.put("231027", "friday")
+
+    assert PuzzleStore(str(tmp_path)).dates() == ["231026", "231027"]
+    assert first.get("231027") == "friday"
+
+
+def test_store_indexes_payloads_from_an_old_json_index(tmp_path):
+    old = PuzzleStore(str(tmp_path / "old"))
+    old.put("231026", "thursday")
+    old.put("231027", "friday")
+    old.close()
+    (tmp_path / "old" / "index.db").unlink()
+    (tmp_path / "old" / "index.json").write_text(json.dumps({"231026": {"size": 1, "accessed": 5.0}}))
+
+    reopened = PuzzleStore(str(tmp_path / "old"))
+    assert reopened.dates() == ["231026", "231027"]
+    assert reopened.get("231027") == "friday"
+
+
+def test_store_evicts_least_recently_read(tmp_path):
+    store = PuzzleStore(str(tmp_path), max_bytes=10**6)
+    store.seed([("230101", "a" * 100), ("230102", "b" * 100), ("230103", "c" * 100)])
+    store.get("230101")
+    store.max_bytes = store.total_bytes - 1
+
+    store.put("230104", "d" * 100)
+
+    assert "230102" not in store
+    assert "230101" in store
+    assert "230104" in store
+
+
+def test_reader_serves_stored_payload_without_network(tmp_path, monkeypatch):
+    store = PuzzleStore(str(tmp_path))
+    store.put("231026", "cached payload")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("upstream should not be called")
+
+    monkeypatch.setattr("crossword.data_reader.requests.get", fail)
+    reader = DataReader(store=store)
+
+    assert reader._fetch_data("231026") == "cached payload"
+    start = datetime(2023, 10, 26)
+    assert list(reader.fetch_data(start, start)) == []
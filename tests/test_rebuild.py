@@ -0,0 +1,24 @@
+from crossword.archive import SQLiteArchive
+from crossword.puzzle_store import PuzzleStore
+from crossword.rebuild import rebuild
+
+from benchmarks.synthetic import generate_payload
+
+
+def test_rebuild_writes_entries_and_reports_failures(tmp_path, simple_crossword):
+    store = PuzzleStore(str(tmp_path / "store"))
+    for date in ("231026", "231027", "231028"):
+        store.put(date, generate_payload(simple_crossword.model_copy(update={"date": date})))
+    store.put("231029", "ARCHIVE\n\n231029\n\ntruncated")
+
+    with SQLiteArchive(str(tmp_path / "archive.db")) as archive:
+        report = rebuild(store.directory, archive, workers=2, chunksize=1, batch_size=2)
+
+        assert (report.total, report.rebuilt) == (4, 3)
+        assert list(report.failures) == ["231029"]
+        assert [row["date"] for row in archive.find()] == ["231026", "231027", "231028"]
+        answers = archive.connection.execute(
+            "SELECT answer FROM clues WHERE date = '231027' AND direction = 'across' ORDER BY position"
+        ).fetchall()
+        assert [answer for answer, in answers] == ["CAT", "ARE", "TEA"]
+        assert archive.search("hot drink")[0]["date"] in ("231026", "231027", "231028")
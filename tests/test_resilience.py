@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+from requests.exceptions import ConnectionError, HTTPError
+
+from crossword.data_reader import DataReader
+from crossword.resilience import (
+    CircuitBreaker, CircuitOpenError, SingleFlight, UpstreamError, UpstreamNotFoundError, backoff_delays,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_then_probes_after_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.retry_after() == 10
+
+    clock.now = 10
+    assert breaker.allow()  # the half-open probe
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_probes_again_when_a_probe_never_reports():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()  # this probe is cancelled and never reports
+    clock.now = 15
+    assert not breaker.allow() and breaker.retry_after() == 5
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+def test_backoff_is_jittered_and_capped():
+    delays = list(backoff_delays(1, 6, cap=4))
+    assert len(delays) == 6
+    assert all(0 <= delay <= min(4, 2 ** i) for i, delay in enumerate(delays))
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "payload"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("231026", fetch)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("231026", fetch))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert results == ["payload"] * 4
+    assert len(calls) == 1
+
+
+def test_reader_fails_fast_once_the_circuit_opens(monkeypatch):
+    attempts = []
+
+    def get(url, params=None, **kwargs):
+        attempts.append(params["date"])
+        raise ConnectionError("down")
+
+    monkeypatch.setattr("crossword.data_reader.requests.get", get)
+    monkeypatch.setattr("crossword.data_reader.sleep", lambda seconds: None)
+    reader = DataReader(max_retries=5, breaker=CircuitBreaker(failure_threshold=3))
+
+    with pytest.raises(UpstreamError):
+        reader._fetch_data("231026")
+    assert len(attempts) == 3
+    with pytest.raises(CircuitOpenError):
+        reader._fetch_data("231027")
+    assert len(attempts) == 3
+
+
+class StatusResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ""
+
+    def raise_for_status(self):
+        raise HTTPError(f"{self.status_code}", response=self)
+
+
+def test_client_errors_are_not_retried_or_counted(monkeypatch):
+    statuses = {"991231": 404, "231026": 503}
+    attempts = []
+
+    def get(url, params=None, **kwargs):
+        attempts.append(params["date"])
+        return StatusResponse(statuses[params["date"]])
+
+    monkeypatch.setattr("crossword.data_reader.requests.get", get)
+    monkeypatch.setattr("crossword.data_reader.sleep", lambda seconds: None)
+    reader = DataReader(max_retries=3, breaker=CircuitBreaker(failure_threshold=3))
+
+    for _ in range(5):
+        with pytest.raises(UpstreamNotFoundError):
+            reader._fetch_data("991231")
+    assert attempts == ["991231"] * 5
+    assert reader.breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(UpstreamError):
+        reader._fetch_data("231026")
+    assert attempts.count("231026") == 3
+    assert reader.breaker.state == CircuitBreaker.OPEN
+
+
+def test_missing_puzzle_returns_404(client, monkeypatch):
+    monkeypatch.setattr("crossword.data_reader.requests.get", lambda url, **kwargs: StatusResponse(404))
+
+    assert client.get("/puzzle/991231").status_code == 404
+
+
+def test_open_circuit_returns_503(client):
+    from crossword import app as app_module
+
+    app_module.reader.breaker.failure_threshold = 1
+    app_module.reader.breaker.record_failure()
+
+    response = client.get("/puzzle/231026")
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,29 @@
+from crossword.response_cache import ResponseCache, make_etag
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("231026", b"a")
+    cache.put("231027", b"b")
+    cache.get("231026")
+    cache.put("231028", b"c")
+
+    assert "231027" not in cache
+    assert cache.get("231026").body == b"a"
+    assert len(cache) == 2
+
+
+def test_get_or_build_only_builds_once():
+    cache = ResponseCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b'{"puzzle":1}'
+
+    first = cache.get_or_build("231026", build)
+    second = cache.get_or_build("231026", build)
+
+    assert first == second
+    assert first.etag == make_etag(b'{"puzzle":1}')
+    assert len(builds) == 1
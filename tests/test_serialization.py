@@ -0,0 +1,47 @@
+import json
+
+from benchmarks.synthetic import generate_crossword
+from crossword.crossword_builder import build_crossword, build_entries, process_rebus_grid
+from crossword.serialization import (
+    COMPACT_MIMETYPE, accepts_compact, dumps_compact, dumps_puzzle, dumps_puzzle_list, expand_compact,
+)
+
+
+def test_build_entries_matches_build_crossword(sample_crossword):
+    entries = build_entries(sample_crossword)
+
+    assert [entry._asdict() for entry in entries] == [
+        entity.model_dump() for entity in build_crossword(sample_crossword)
+    ]
+
+
+def test_dumps_puzzle_matches_model_dump(sample_crossword):
+    crossword = sample_crossword.model_copy(
+        update={"date": "231026", "title": 'Quotes "and" ünïcode', "authors": ["A", "B"]}
+    )
+
+    body = json.loads(dumps_puzzle(crossword, build_entries(crossword)))
+
+    assert body == {
+        "metadata": {"date": "231026", "title": 'Quotes "and" ünïcode', "authors": ["A", "B"]},
+        "entries": [entity.model_dump() for entity in build_crossword(crossword)],
+    }
+    assert json.loads(dumps_puzzle_list([b'{"a":1}', b'{"b":2}'])) == {"puzzles": [{"a": 1}, {"b": 2}]}
+
+
+def test_compact_body_expands_to_the_same_entries(sample_crossword):
+    for crossword in [sample_crossword, generate_crossword(21, rebus_rate=0.05, seed=3)]:
+        full = dumps_puzzle(crossword, build_entries(crossword))
+        compact = dumps_compact(crossword, *process_rebus_grid(crossword.grid))
+
+        assert expand_compact(json.loads(compact)) == build_entries(crossword)
+        assert json.loads(compact)["metadata"] == json.loads(full)["metadata"]
+    assert len(compact) < len(full) / 2
+
+
+def test_compact_is_negotiated_by_query_or_accept_header():
+    assert accepts_compact("compact", "")
+    assert not accepts_compact("full", COMPACT_MIMETYPE)
+    assert accepts_compact(None, f"{COMPACT_MIMETYPE}, application/json;q=0.5")
+    assert not accepts_compact(None, f"application/json, {COMPACT_MIMETYPE};q=0")
+    assert not accepts_compact(None, "*/*")
@@ -0,0 +1,116 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from crossword.data_reader import DataReader
+from crossword.resilience import UpstreamBusyError, UpstreamNotFoundError
+from crossword.service import PuzzleService
+from crossword.shared_cache import SharedCache
+
+
+def _build_slowly(path, builds):
+    def build():
+        builds.put(1)
+        time.sleep(0.3)
+        return b'{"puzzle":1}'
+    return SharedCache(path, poll_interval=0.01).get_or_build("231026", build)
+
+
+def test_only_one_worker_process_builds_a_key(tmp_path):
+    path = str(tmp_path / "shared.db")
+    SharedCache(path).close()  # create the schema before the workers race
+    context = multiprocessing.get_context("fork")
+    builds = context.Queue()
+    workers = [context.Process(target=_build_slowly, args=(path, builds)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+
+    assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+    assert builds.get(timeout=1) == 1 and builds.empty()
+    assert SharedCache(path).get("231026") == b'{"puzzle":1}'
+
+
+def test_expired_lease_is_taken_over_and_oldest_responses_evicted(tmp_path):
+    stuck = SharedCache(str(tmp_path / "shared.db"), lease_seconds=0.05)
+    other = SharedCache(str(tmp_path / "shared.db"), max_entries=2)
+    assert stuck.acquire("231026")
+    assert not other.acquire("231026")
+    time.sleep(0.1)
+    assert other.acquire("231026")
+
+    for key in ("a", "b", "c"):
+        other.put(key, key.encode())
+    assert len(other) == 2 and other.get("a") is None
+
+
+def test_services_in_different_workers_share_built_puzzles(tmp_path, upstream):
+    path = str(tmp_path / "shared.db")
+    first = PuzzleService(DataReader(), shared=SharedCache(path))
+    second = PuzzleService(DataReader(), shared=SharedCache(path))
+
+    assert first.get_puzzle("231026").body == second.get_puzzle("231026").body
+    assert upstream == ["231026"]
+
+
+def test_async_fill_stores_for_sync_readers(tmp_path):
+    cache = SharedCache(str(tmp_path / "shared.db"))
+
+    async def build():
+        return b"async"
+
+    assert asyncio.run(cache.get_or_build_async("231026", build)) == b"async"
+    assert cache.get_or_build("231026", lambda: b"rebuilt") == b"async"
+
+
+def test_forked_workers_do_not_share_a_lease_owner(tmp_path):
+    cache = SharedCache(str(tmp_path / "shared.db"))
+    assert cache.acquire("231026")
+    # A worker forked from this process must not be able to release its lease
+    child = multiprocessing.get_context("fork").Process(target=cache.release, args=("231026",))
+    child.start()
+    child.join(10)
+
+    assert child.exitcode == 0
+    assert not SharedCache(str(tmp_path / "shared.db")).acquire("231026")
+
+
+def _fail_while_waited_on(path, error, waiter_build):
+    """Run a build that raises ``error`` and, while it runs, a waiter's ``get_or_build``."""
+    builder, waiter = SharedCache(path), SharedCache(path, poll_interval=0.01)
+    started = threading.Event()
+
+    def failing_build():
+        started.set()
+        time.sleep(0.1)
+        raise error
+
+    thread = threading.Thread(target=lambda: pytest.raises(type(error), builder.get_or_build,
+                                                           "231026", failing_build))
+    thread.start()
+    started.wait(1)
+    try:
+        return waiter.get_or_build("231026", waiter_build)
+    finally:
+        thread.join()
+
+
+def test_waiters_raise_the_error_of_a_failed_build(tmp_path):
+    path = str(tmp_path / "shared.db")
+    rebuilds = []
+    with pytest.raises(UpstreamNotFoundError) as error:
+        _fail_while_waited_on(path, UpstreamNotFoundError("231026", 404), lambda: rebuilds.append(1))
+
+    assert error.value.status == 404 and error.value.date == "231026" and rebuilds == []
+    # Later requests try again
+    assert SharedCache(path).get_or_build("231026", lambda: b"found") == b"found"
+
+
+def test_waiters_build_themselves_after_a_transient_failure(tmp_path):
+    # A shed prefetch must not fail the interactive request waiting on it
+    body = _fail_while_waited_on(str(tmp_path / "shared.db"), UpstreamBusyError("231026", 1.0), lambda: b"built")
+    assert body == b"built"
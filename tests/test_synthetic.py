@@ -0,0 +1,28 @@
+from benchmarks.run import compare
+from benchmarks.synthetic import generate_crossword, generate_grid, generate_payload
+from crossword.crossword_builder import build_crossword
+from crossword.entity import Crossword
+
+
+def test_generated_grid_is_symmetric_with_requested_density():
+    grid = generate_grid(21, density=0.2, seed=3)
+
+    assert len(grid) == 21 and all(len(row) == 21 for row in grid)
+    blacks = {(x, y) for y, row in enumerate(grid) for x, char in enumerate(row) if char == "#"}
+    assert blacks == {(20 - x, 20 - y) for x, y in blacks}
+    assert len(blacks) >= 0.2 * 21 * 21
+
+
+def test_generated_payload_round_trips_with_a_clue_per_slot():
+    crossword = generate_crossword(15, rebus_rate=0.1, seed=7)
+    payload = generate_payload(crossword, trailer=True)
+
+    assert Crossword.from_api_response(payload) == crossword
+    assert len(build_crossword(crossword)) == len(crossword.across) + len(crossword.down)
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    baseline = {"a": {"seconds": 1.0, "peak_bytes": 100}, "b": {"seconds": 1.0, "peak_bytes": 100}}
+    results = {"a": {"seconds": 1.2, "peak_bytes": 100}, "b": {"seconds": 1.3, "peak_bytes": 200}}
+
+    assert compare(results, baseline, tolerance=0.25) == ["b seconds", "b peak_bytes"]
@@ -0,0 +1,57 @@
+import pytest
+
+from crossword.data_reader import DataReader
+from crossword.resilience import CircuitBreaker, UpstreamBusyError
+from crossword.throttle import PREFETCH, ShedError, UpstreamScheduler, set_upstream_priority
+
+
+@pytest.fixture
+def prefetch():
+    set_upstream_priority(PREFETCH)
+    yield
+    set_upstream_priority(None)
+
+
+def test_prefetch_leaves_reserve_for_interactive(prefetch):
+    scheduler = UpstreamScheduler(rate=1, burst=2, reserve=1, max_wait=0.1)
+    scheduler.acquire()
+    with pytest.raises(ShedError) as shed:
+        scheduler.acquire()
+    assert 0 < shed.value.retry_after <= 1
+
+    set_upstream_priority(None)
+    scheduler.acquire()  # the reserved token, without waiting
+
+
+def test_shed_prefetch_does_not_take_the_half_open_probe(upstream, prefetch):
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10
+    scheduler = UpstreamScheduler(rate=50, burst=1, max_wait=0.001)
+    scheduler._tokens = 0
+    reader = DataReader(rate_limiter=scheduler, breaker=breaker)
+
+    with pytest.raises(UpstreamBusyError):
+        reader._fetch_data("231026")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    set_upstream_priority(None)
+    assert reader._fetch_data("231026")
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert upstream == ["231026"]
+
+
+def test_prefetch_requests_are_shed_first(client, monkeypatch):
+    from crossword import app as app_module
+
+    scheduler = UpstreamScheduler(rate=20, burst=1, max_wait=0.01)
+    scheduler._tokens = 0
+    monkeypatch.setattr(app_module.reader, "rate_limiter", scheduler)
+
+    shed = client.get("/random_crossword/monday?count=3&priority=prefetch")
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+
+    assert client.get("/random_crossword/monday", headers={"X-Crossword-Priority": "prefetch"}).status_code == 503
+    assert client.get("/random_crossword/monday").status_code == 200
@@ -0,0 +1,62 @@
+from datetime import date
+
+from crossword.data_reader import DataReader
+from crossword.date_sampler import WeekdaySampler
+from crossword.service import PuzzleService
+from crossword.warm_pool import WarmPool
+
+
+def make_pool(monkeypatch, low=2, high=4):
+    sampler = WeekdaySampler(begin=date(2023, 1, 1), end=date(2023, 3, 1))
+    pool = WarmPool(PuzzleService(DataReader()), sampler, low=low, high=high)
+    # Fill synchronously in the test instead of on the background thread
+    monkeypatch.setattr(pool, "start", lambda: None)
+    return pool
+
+
+def test_fill_tops_up_each_weekday_to_high(upstream, monkeypatch):
+    pool = make_pool(monkeypatch)
+    assert pool.fill() == 28
+    assert all(pool.size(weekday) == 4 for weekday in range(7))
+    assert pool.fill() == 0
+    assert len(upstream) == 28
+
+
+def test_pop_skips_excluded_dates(upstream, monkeypatch):
+    pool = make_pool(monkeypatch, high=2)
+    pool.fill()
+    held = [entry[0] for entry in pool._pools[3]]
+
+    first = pool.pop(3, exclude=[held[0]])
+    assert first is not None and pool.size(3) == 1
+    assert pool.pop(3, exclude=[held[0]]) is None
+    assert pool.pop(3) is not None
+
+
+def test_pop_normalizes_excluded_dates(upstream, monkeypatch):
+    pool = make_pool(monkeypatch, high=3)
+    pool.fill()
+    first, second, third = [entry[0] for entry in pool._pools[3]]
+    full, iso = "20" + first, f"20{second[:2]}-{second[2:4]}-{second[4:]}"
+
+    assert pool.pop(3, exclude=[full, iso, "not a date"])[0] == third
+    assert pool.pop(3, exclude=[date(2000 + int(first[:2]), int(first[2:4]), int(first[4:]))])[0] == second
+
+
+def test_disabled_pool_serves_nothing(upstream):
+    pool = WarmPool(PuzzleService(DataReader()), WeekdaySampler(), high=0)
+    assert pool.pop(3) is None
+
+
+def test_random_crossword_is_served_from_pool(client, upstream, monkeypatch):
+    from crossword import app as app_module
+
+    pool = make_pool(monkeypatch, high=1)
+    pool.fill()
+    monkeypatch.setattr(app_module, "warm_pool", pool)
+    fetched = len(upstream)
+
+    response = client.get("/random_crossword/thursday")
+    assert response.status_code == 200
+    assert len(upstream) == fetched
+    assert pool.size(3) == 0